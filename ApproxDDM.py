@@ -5,24 +5,63 @@ Implementation of the Approximate Double Description Method
 """
 import numpy as np 
 from Problem import Problem
+from Problem import RowStream
+from Problem import read_rows
+from Order import reorder
+from Order import most_violated
+from Budget import Budget
 from time import process_time as clock
+from time import perf_counter
+from sys import getsizeof
 
 
 
 
+def bit_pairs(inc):
+    """
+    returns the pairs (rows,facets) of the set bits of the packed incidence
+    bitsets in the rows of inc (see NodePool) as two arrays, ordered by row 
+    and facet
+    """
+    r,w=np.nonzero(inc)
+    bits=np.unpackbits(inc[r,w].astype('<u8').view(np.uint8).reshape(-1,8),axis=1,bitorder='little')
+    k,b=np.nonzero(bits)
+    return r[k],w[k]*64+b
+
+
+def inc_list(inc):
+    """
+    returns the facet indices of the packed incidence bitset inc in increasing order
+    """
+    return bit_pairs(inc[np.newaxis])[1].tolist()
+
+
+def bit(j):
+    """
+    returns the bit of facet j in its word of a packed incidence bitset
+    """
+    return np.uint64(1)<<np.uint64(j & 63)
+    
+
+
+
 class Node():
     """
-    Implements a 3D vector with incidence information         
+    Implements a 3D vector with incidence information,
+    a node is a handle to its row in the NodePool of an ApproxDDM
     """
-    node_cnt=0
-    def __init__(self):
-        self.index=Node.node_cnt
-        Node.node_cnt+=1
-        self.vector=None
-        self.inc=[]
-        self.sign=0 # 0: '0'
-                    # 1: '-'
-                    # 2: '+'
+    __slots__=('pool','index')
+    def __init__(self,pool,index):
+        self.pool=pool
+        self.index=index # stable id of the node
+        
+
+    def __eq__(self,other):
+        return type(other) is Node and other.index==self.index and other.pool is self.pool
+        
+        
+    def __hash__(self):
+        return hash(('n',self.index))
         
 
     def __str__(self):
@@ -33,16 +72,142 @@ class Node():
         return 'n({0})'.format(self.index)
         
         
+    @property
+    def vector(self):
+        return self.pool.vec[self.pool.row.item(self.index)].copy() # rows are moved by compact()
+        
+        
+    @property
+    def inc(self):
+        return self.pool.inc[self.pool.row.item(self.index)].copy()
+        
+        
+    @property
+    def sign(self):
+        return self.pool.sign.item(self.pool.row.item(self.index))
+        
+        
     def info(self):
         print('Node')
         print('  Index          :  {}'.format(self.index))
         print('  Vector         :  {}'.format(self.vector))
-        print('  Incidence list :  {}'.format(self.inc))
+        print('  Incidence list :  {}'.format(inc_list(self.inc)))
         print('  Sign           :  {}'.format(V_SIGN[self.sign])) 
         
         
         
         
+class NodePool():
+    """
+    Array-backed storage of the nodes of ApproxDDM
+        row r holds vector, sign and incidence bitset of a node,
+        id[r] is the stable id of this node and row[id] its current row (-1: removed)
+        the bitsets are packed into words of 64 bits, bit j%64 of word j//64 
+        is set if the node is incident to facet j, all rows have the same 
+        number of words (grown with the number of rows processed)
+    """
+    def __init__(self,dim,cap=64,words=1):
+        self.size=0
+        self.id_cnt=0
+        self.vec=np.empty((cap,dim))
+        self.sign=np.zeros(cap,dtype=np.int8) # 0: '0'
+                                              # 1: '-'
+                                              # 2: '+'
+        self.inc=np.zeros((cap,words),dtype=np.uint64) # packed bitsets
+        self.id=np.empty(cap,dtype=np.int64)
+        self.row=np.full(cap,-1,dtype=np.int64)
+        
+        
+    def __grow(self,a,n,fill):
+        b=np.empty((n,)+a.shape[1:],dtype=a.dtype)
+        b[0:a.shape[0]]=a
+        b[a.shape[0]:]=fill
+        return b
+        
+        
+    def widen(self,bits,limit):
+        """
+        makes room for the bits of the facets 0,...,bits-1, the number of
+        words is doubled but not beyond the words of limit bits
+        """
+        w=self.inc.shape[1]
+        if bits>64*w:
+            n=max(-(-bits//64),min(2*w,-(-limit//64)))
+            inc=np.zeros((self.inc.shape[0],n),dtype=np.uint64)
+            inc[:,0:w]=self.inc
+            self.inc=inc
+        
+        
+    def append(self,vec,inc):
+        """
+        appends nodes with the rows of vec as vectors and the rows of the 
+        array inc as packed incidences, returns the list of their ids
+        """
+        k=inc.shape[0]
+        n=self.size+k
+        if n>self.sign.shape[0]:
+            cap=max(n,2*self.sign.shape[0])
+            self.vec=self.__grow(self.vec,cap,0)
+            self.sign=self.__grow(self.sign,cap,0)
+            self.inc=self.__grow(self.inc,cap,0)
+            self.id=self.__grow(self.id,cap,0)
+        if self.id_cnt+k>self.row.shape[0]:
+            self.row=self.__grow(self.row,max(self.id_cnt+k,2*self.row.shape[0]),-1)
+        ids=np.arange(self.id_cnt,self.id_cnt+k)
+        self.vec[self.size:n]=vec
+        self.sign[self.size:n]=0
+        self.inc[self.size:n]=inc
+        self.id[self.size:n]=ids
+        self.row[ids]=np.arange(self.size,n)
+        self.size=n
+        self.id_cnt+=k
+        return ids.tolist()
+        
+        
+    def compact(self,keep):
+        """
+        removes the nodes in the rows r with keep[r]==False at once,
+        the remaining rows keep their order
+        """
+        n=self.size
+        self.row[self.id[0:n][~keep]]=-1
+        s=int(np.argmin(keep)) # rows before the first removed row stay
+        keep=keep[s:]
+        k=s+int(np.count_nonzero(keep))
+        self.vec[s:k]=self.vec[s:n][keep]
+        self.sign[s:k]=self.sign[s:n][keep]
+        self.inc[s:k]=self.inc[s:n][keep]
+        self.id[s:k]=self.id[s:n][keep]
+        self.row[self.id[s:k]]=np.arange(s,k)
+        self.size=k
+        
+        
+    def renumber(self):
+        """
+        sets the ids to 0,...,size-1 in row order
+        """
+        self.row[0:self.id_cnt]=-1
+        self.id[0:self.size]=np.arange(self.size)
+        self.row[0:self.size]=np.arange(self.size)
+        self.id_cnt=self.size
+        
+        
+    def get_coords(self):
+        """
+        returns the node vectors as rows of an array (no copy)
+        """
+        return self.vec[0:self.size]
+        
+        
+    def nbytes(self):
+        """
+        returns the number of bytes of the arrays
+        """
+        return self.vec.nbytes+self.sign.nbytes+self.inc.nbytes+self.id.nbytes+self.row.nbytes
+        
+        
+        
+        
 class Facet():
     """
     Implements "Facet" which corresponds to an inequality and its approximately incident nodes         
@@ -71,14 +236,29 @@ class Facet():
 class ApproxDDM:
     """
     Implements the Approximate Double Description Method         
+        with a row stream (Problem.source) the rows are not kept, but each 
+        node has an incidence bitset of m/64 words and each row processed a 
+        Facet, so the memory grows with the number m of rows, other than for
+        GraphAlg
     """
     def __init__(self, problem):
         self.problem=problem
-        self.nodes=[]
+        self.pool=NodePool(3)
         self.facets=[]
+        self.all_facets=[] # facets of all rows processed, facets is the subset with more than two nodes
+        self.incident={} # inverted index: incident[j] holds the ids of the nodes incident to facet j (dict as ordered set)
         self.matrix=problem.matrix
         self.eps=problem.eps
         self.iter = 0
+        self.block=0     # number of upcoming rows evaluated at once, 0: off
+        self.block_end=0 # block evaluated for the rows block_end-len(active),...,block_end-1
+        self.active=None # active[i]: row block_end-len(active)+i has a node with sign '0' or '+'
+        self.skipped=[]  # rows skipped since all nodes have sign '-'
+        self.order='file'
+        self.peak_size=0 # maximal number of nodes after a step 
+        self.peak_iter=0 # row after which peak_size was reached
+        self.recorder=None # Recorder for per-row statistics, see Recorder.py, None: off
+        self.stopped=None  # reason why the last run() stopped early, see Budget.py, None: finished
         self.__init_nodes()
         
         self.time0=0
@@ -90,20 +270,28 @@ class ApproxDDM:
         #self.time6=0
         
         
-    def __add_node(self):
-        n=Node()
-        self.nodes.append(n)
-        return n
+    @property
+    def nodes(self):
+        """
+        list of handles to the current nodes
+        """
+        return [Node(self.pool,i) for i in self.pool.id[0:self.pool.size].tolist()]
         
-    
-    def __remove_node(self,n):
-        self.nodes.remove(n)
-        del n
+        
+    def __add_nodes_to_pool(self,vec,inc):
+        """
+        appends nodes to the pool and registers them in the inverted index
+        """
+        ids=self.pool.append(vec,inc)
+        r,facets=bit_pairs(inc)
+        for k,j in zip(r.tolist(),facets.tolist()):
+            self.incident.setdefault(j,{})[ids[k]]=None
         
         
     def __add_facet(self):
         f=Facet()
         self.facets.append(f)
+        self.all_facets.append(f)
         return f
         
     
@@ -116,87 +304,193 @@ class ApproxDDM:
         """
         initialize as simplex
         """
-        node_cnt=0
         A=self.matrix[0:4]
-        k={0,1,2,3}
+        k=0b1111
+        vec=np.empty((4,3))
+        inc=np.zeros((4,1),dtype=np.uint64)
         for i in range(4): 
             f=self.__add_facet()
             f.index=i
             f.hyperplane=self.matrix[i]
-            n=self.__add_node()         
-            n.vector=np.linalg.solve(np.delete(A,i,0),(1+self.eps/2)*np.ones(3))
-            n.inc=k.copy()
-            n.inc.remove(i)
+            vec[i]=np.linalg.solve(np.delete(A,i,0),(1+self.eps/2)*np.ones(3))
+            inc[i,0]=k ^ (1<<i)
             self.iter+=1
+        self.__add_nodes_to_pool(vec,inc)
             
     def __set_v_signs(self):
         hp=self.matrix[self.iter]
-        for n in self.nodes:
-            #res=hp @ n.vector -> a bit faster:
-            res0=hp[0]*n.vector[0]
-            res1=hp[1]*n.vector[1]
-            res2=hp[2]*n.vector[2]
-            res=res0+res1+res2
-            if (res < 1):
-                n.sign=1 # '-'
-            elif (res > 1+self.eps):
-                n.sign=2 # '+'
-            else:
-                n.sign=0 # '0'
+        res=self.pool.get_coords() @ hp
+        self.pool.sign[0:self.pool.size]=np.where(res<1,1,np.where(res>1+self.eps,2,0))
                 
     def __add_nodes(self):
         hp=self.matrix[self.iter]
         f=self.__add_facet()
         f.index=self.iter
-        f.hyperplane=hp
-        for w in self.nodes[:]:
-            if w.sign==2: # '+'
-                for u in self.nodes[:]:
-                    if u.sign==1: # '-'
-                        if len(set.intersection(u.inc,w.inc))>=2:
-                            n=self.__add_node()                        
-                            hw=hp @ w.vector 
-                            hd=hp @ (u.vector-w.vector)        
-                            n.vector = ((1 + self.eps/2 - hw)/ hd) * (u.vector-w.vector) + w.vector
-                            n.inc=set.intersection(u.inc,w.inc)
-                            n.inc.add(self.iter)
-            elif w.sign==0: # '0'
-                w.inc.add(self.iter)
+        f.hyperplane=hp.copy() # hp may be a view of a chunk of a row stream
+        p=self.pool
+        p.widen(self.iter+1,self.matrix.shape[0])
+        word=self.iter>>6
+        ws,us=self.__adjacent(np.flatnonzero(p.sign[0:p.size]==2))
+        zero=np.flatnonzero(p.sign[0:p.size]==0) # '0'
+        if zero.shape[0]>0:
+            p.inc[zero,word]|=bit(self.iter)
+            f_zero=self.incident.setdefault(self.iter,{})
+            for i in p.id[zero].tolist():
+                f_zero[i]=None
+        if ws.shape[0]>0:
+            new=p.inc[ws] & p.inc[us] # incidences of the new nodes
+            new[:,word]|=bit(self.iter)
+            W=p.vec[ws]
+            D=p.vec[us]-W
+            t=(1 + self.eps/2 - W @ hp)/(D @ hp)
+            self.__add_nodes_to_pool(t[:,np.newaxis]*D+W,new)
+                
+                
+    def __adjacent(self,plus,size=2**20):
+        """
+        returns the rows ws of '+'-nodes and us of '-'-nodes of the adjacent 
+        pairs (sharing at least two facets) for the '+'-nodes in the rows plus
+            the candidates are the '-'-nodes sharing a facet with a '+'-node 
+            (inverted index), the common facets of all pairs are counted at 
+            once by a product of the incidences restricted to the facets of 
+            the '+'-nodes, in blocks of at most size pairs
+        """
+        p=self.pool
+        empty=np.empty(0,dtype=np.int64)
+        if plus.shape[0]==0:
+            return empty,empty
+        r,j=bit_pairs(p.inc[plus])
+        cols,c=np.unique(j,return_inverse=True)
+        cand=set()
+        for f in cols.tolist():
+            cand.update(self.incident[f])
+        minus=np.sort(p.row[np.fromiter(cand,dtype=np.int64,count=len(cand))])
+        minus=minus[p.sign[minus]==1] # '-'
+        if minus.shape[0]==0:
+            return empty,empty
+        P=np.zeros((plus.shape[0],cols.shape[0]))
+        P[r,c]=1
+        M=(p.inc[np.ix_(minus,cols>>6)]>>(cols & 63).astype(np.uint64)) & np.uint64(1)
+        M=M.T.astype(float)
+        ws=[]
+        us=[]
+        chunk=max(1,size//minus.shape[0])
+        for k in range(0,plus.shape[0],chunk):
+            w,u=np.nonzero(P[k:k+chunk] @ M>=2)
+            ws.append(plus[w+k])
+            us.append(minus[u])
+        return np.concatenate(ws),np.concatenate(us)
                 
     
     def __del_nodes(self):
-        for w in self.nodes[:]:
-            if w.sign==2: # '+'
-                self.__remove_node(w)
+        p=self.pool
+        plus=p.sign[0:p.size]==2 # '+'
+        if plus.any():
+            ids=p.id[0:p.size][plus]
+            r,facets=bit_pairs(p.inc[0:p.size][plus])
+            for i,j in zip(ids[r].tolist(),facets.tolist()):
+                del self.incident[j][i]
+            p.compact(~plus)
                 
+    def __active(self):
+        """
+        block mode: decides whether the row matrix[iter] has a node with sign
+        '0' or '+', the next block of rows is evaluated at once if necessary
+            a row with only '-'-nodes adds no node and no incidence, neither now 
+            nor later, since new nodes are convex combinations of existing ones
+        """
+        if self.iter>=self.block_end:
+            rows=self.matrix[self.iter:self.iter+self.block]
+            res=self.pool.get_coords() @ rows.T
+            self.active=res.max(axis=0)>=1
+            self.block_end=self.iter+rows.shape[0]
+        return self.active[self.iter-self.block_end+len(self.active)]
+        
+        
+    def __farthest_first(self):
+        """
+        order 'farthest': moves the row most violated by the nodes to 
+        position iter, returns whether a node has sign '0' or '+'
+        """
+        i,res=most_violated(self.matrix,self.iter,self.pool.get_coords())
+        self.matrix[[self.iter,i]]=self.matrix[[i,self.iter]]
+        return res>=1
+        
+        
+    def set_order(self,order='file',seed=0):
+        """
+        sets the order of the rows not processed yet, see Order.py
+        """
+        self.matrix=reorder(self.matrix,self.iter,order,seed)
+        if order=='farthest':
+            self.matrix=self.matrix.copy() # rows are swapped in each step
+        self.order=order
+        self.block_end=self.iter # evaluated block is invalid
+        
+        
     def step(self):
         if self.iter < self.matrix.shape[0]:
-            #print('set_signs')
-            t=clock()
-            self.__set_v_signs()
-            self.time1+=clock()-t
-            #print('add_nodes')
-            t=clock()
-            self.__add_nodes()
-            self.time2+=clock()-t
-            #print('del_nodes')
-            t=clock()
-            self.__del_nodes()
-            self.time3+=clock()-t
-             
+            if self.order=='farthest':
+                if not self.__farthest_first(): # all nodes have sign '-' for the rows left
+                    self.skipped.extend(range(self.iter,self.matrix.shape[0]))
+                    self.iter=self.matrix.shape[0]
+                    return
+                active=True
+            else:
+                active=self.block==0 or self.__active()
+            if active:
+                if self.recorder is not None:
+                    w,c=perf_counter(),clock()
+                    t0=(self.time1,self.time2,self.time3)
+                    n0=(self.pool.id_cnt,self.pool.size)
+                #print('set_signs')
+                t=clock()
+                self.__set_v_signs()
+                self.time1+=clock()-t
+                #print('add_nodes')
+                t=clock()
+                self.__add_nodes()
+                self.time2+=clock()-t
+                #print('del_nodes')
+                t=clock()
+                self.__del_nodes()
+                self.time3+=clock()-t
+                if self.recorder is not None:
+                    c,w=clock()-c,perf_counter()-w
+                    add=self.pool.id_cnt-n0[0]
+                    self.recorder.append({'row':self.iter,'wall':w,'cpu':c,
+                        'signs':self.time1-t0[0],'add':self.time2-t0[1],'delete':self.time3-t0[2],
+                        'n_add':add,'n_del':add-self.pool.size+n0[1],'nodes':self.pool.size},self.nbytes)
+            else:
+                self.skipped.append(self.iter)
+            if self.pool.size>self.peak_size:
+                self.peak_size=self.pool.size
+                self.peak_iter=self.iter
             self.iter +=1           
         else:
             print('ApproxVE.step(): no further step to do.')
             
     
+    def nbytes(self):
+        """
+        returns the number of bytes of the node pool and the inverted index
+        """
+        return (self.pool.nbytes()+getsizeof(self.incident)
+                +sum(getsizeof(d) for d in self.incident.values()))
+        
+    
     def set_nodelist_of_facets(self):
-        for f in self.facets[:]:
-            for n in self.nodes:
-                if f.index in n.inc:
-                    f.node_list.append(n)
-            if len(f.node_list)<=2:
-                #print('Facet {} removed'.format(f))
-                self.__remove_facet(f)
+        """
+        sets the node lists of the facets from the inverted index,
+        facets with at most two nodes are removed
+        """
+        keep=[]
+        for f in self.all_facets:
+            ids=self.incident.get(f.index,{})
+            if len(ids)>2:
+                f.node_list=[Node(self.pool,i) for i in sorted(ids)]
+                keep.append(f)
+        self.facets=keep
                 
                 
     def list_facets(self):
@@ -214,33 +508,75 @@ class ApproxDDM:
         updates the node indices so that the maximum index
         matches the number of nodes
         """
-        ind = 0
-        for n in self.nodes:
-            n.index=ind
-            ind+=1
+        self.pool.renumber()
+        self.incident={}
+        p=self.pool
+        r,facets=bit_pairs(p.inc[0:p.size])
+        for i,j in zip(r.tolist(),facets.tolist()):
+            self.incident.setdefault(j,{})[i]=None
             
-    def run(self):
+    def run(self,time_limit=None,max_rows=None,callback=None,cancel=None):
+        """
+        processes the remaining rows, returns True if finished and False if 
+        stopped early by the limits (see Budget.py), the reason is stored in
+        self.stopped and the run is continued by calling run() again
+            the node lists of the facets are set only at the end of a run
+        """
         t0=clock()
-        
+        budget=Budget(time_limit,max_rows,callback,cancel)
         while self.iter < self.matrix.shape[0]:
             #print('ApproxDDM: Processing inequality {}'.format(self.iter))
+            self.stopped=budget.check(self)
+            if self.stopped is not None:
+                self.time0+=clock()-t0
+                return False
             self.step()
+        self.stopped=None
         self.update_v_indices()
         
         t4=clock()
         self.set_nodelist_of_facets()
         self.time4+=clock()-t4 
         
-        self.time0=clock()-t0
+        self.time0+=clock()-t0
+        return True
+        
+        
+    def add_inequalities(self,rows):
+        """
+        appends rows (inequalities row x <= 1) to the matrix and processes 
+        them, continuing from the current nodes
+        """
+        if isinstance(self.matrix,RowStream):
+            print('ApproxDDM: inequalities cannot be added to a row stream')
+            exit(1)
+        rows=np.atleast_2d(np.asarray(rows,dtype=float))
+        if rows.shape[1]!=3:
+            print('ApproxDDM: rows with 3 columns expected')
+            exit(1)
+        self.matrix=np.vstack((self.matrix,rows))
+        self.run()
+        
+        
+    def step_many(self,rows,chunk=65536):
+        """
+        adds the inequalities of an iterable of rows (or arrays of rows), 
+        read and processed in chunks of at least chunk rows
+        """
+        source=iter(rows)
+        while True:
+            A=read_rows(source,chunk)
+            if A is None:
+                break
+            self.add_inequalities(A)
         
         
     def kill(self):        
-        for n in self.nodes[:]:
-            self.__remove_node(n)
-        Node.node_cnt=0
+        self.pool=NodePool(3)
+        self.incident={}
         for f in self.facets[:]:
             self.__remove_facet(f)
-        Facet.facet_cnt=0
+        self.all_facets=[]
             
     
     def info(self):
@@ -258,7 +594,12 @@ class ApproxDDM:
         print('  --------------')
         print('  total          : {}'.format(round(self.time0,3)))
         print('--------------------------------------------------')
+        if self.block>0 or self.order=='farthest':
+            print('Skipped rows: {0} of {1}'.format(len(self.skipped),self.matrix.shape[0]))
+        print('Order of rows: {}'.format(self.order))
+        print('Peak size   : {0} nodes after row {1}'.format(self.peak_size,self.peak_iter))
+        print('--------------------------------------------------')
         print('Polytope information .....')
-        print('  Nodes   : {}'.format(len(self.nodes)))
+        print('  Nodes   : {}'.format(self.pool.size))
         print('  Facets  : {}'.format(len(self.facets)))
         print('--------------------------------------------------')
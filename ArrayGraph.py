@@ -0,0 +1,1093 @@
+# -*- coding: utf-8 -*-
+"""
+Array-backed implementation of the half-edge data structure
+
+The links of all halfedges, vertices and faces are stored in contiguous
+NumPy arrays indexed by the element id. HalfEdgeRef, VertexRef and FaceRef
+are light-weight handles (graph, id) that expose the attribute interface of
+HalfEdge, Vertex and Face in Graph.py, so that GraphAlg runs on ArrayGraph
+unchanged. Handles are created on access and are not stored. The passes of 
+GraphAlg over all elements and the hill climbing (split_edges(), cut() and 
+climb()) work on the ids instead (halfedge_ids_of_type(), 
+vertex_ids_of_sign(), face_ids_of_degree() and the *_id operations).
+
+"""
+import numpy as np
+from sys import exit
+from random import random,seed
+from Graph import Graph
+from Graph import H_TYPE
+from Graph import V_SIGN
+
+NONE=-1 # id of a missing reference
+
+
+def _grow(a,n,fill):
+    """
+    returns a copy of the array a with n rows, new rows are set to fill
+    """
+    b=np.empty((n,)+a.shape[1:],dtype=a.dtype)
+    b[0:a.shape[0]]=a
+    b[a.shape[0]:]=fill
+    return b
+
+
+class HalfEdgeRef:
+    """
+    Handle to a halfedge of an ArrayGraph
+    """
+    __slots__=('graph','index')
+    def __init__(self,graph,index):
+        self.graph=graph
+        self.index=index
+
+
+    def __eq__(self,other):
+        return type(other) is HalfEdgeRef and other.index==self.index and other.graph is self.graph
+
+
+    def __hash__(self):
+        return hash(('h',self.index))
+
+
+    def __str__(self):
+        try:
+            return 'h({0},{1})'.format(self.origin.index,self.target().index)
+        except:
+            return 'h(.,.) undefined'
+
+
+    def __repr__(self):
+        return self.__str__()
+
+
+    def __ref(self,i):
+        return None if i==NONE else HalfEdgeRef(self.graph,i)
+
+
+    @property
+    def origin(self):
+        i=self.graph.he_origin.item(self.index)
+        return None if i==NONE else VertexRef(self.graph,i)
+
+    @origin.setter
+    def origin(self,v):
+        self.graph.he_origin[self.index]=NONE if v is None else v.index
+
+
+    @property
+    def face(self):
+        i=self.graph.he_face.item(self.index)
+        return None if i==NONE else FaceRef(self.graph,i)
+
+    @face.setter
+    def face(self,f):
+        self.graph.he_face[self.index]=NONE if f is None else f.index
+
+
+    @property
+    def twin(self):
+        return self.__ref(self.graph.he_twin.item(self.index))
+
+
+    @property
+    def next(self):
+        return self.__ref(self.graph.he_next.item(self.index))
+
+    @next.setter
+    def next(self,h):
+        self.graph.he_next[self.index]=NONE if h is None else h.index
+
+
+    @property
+    def prev(self):
+        return self.__ref(self.graph.he_prev.item(self.index))
+
+    @prev.setter
+    def prev(self,h):
+        self.graph.he_prev[self.index]=NONE if h is None else h.index
+
+
+    @property
+    def main(self):
+        return HalfEdgeRef(self.graph,self.index & ~1) # main halfedge has even id
+
+
+    @property
+    def type(self):
+        return self.graph.he_type.item(self.index)
+
+    @type.setter
+    def type(self,t):
+        self.graph.he_type[self.index]=t
+
+
+    def follows(self, other):
+        self.prev=other
+        other.next=self
+
+
+    def followed_by(self, other):
+        self.next=other
+        other.prev=self
+
+
+    def check_coupling(self):
+        g=self.graph
+        i=self.index
+        if g.he_next[g.he_prev[i]]!=i:
+            return False
+        if g.he_prev[g.he_next[i]]!=i:
+            return False
+        if g.he_twin[g.he_twin[i]]!=i:
+            return False
+        return True
+
+
+    def target(self):
+        return self.twin.origin
+
+
+    def info(self):
+        print('HalfEdge')
+        print('  Index:    {}'.format(self.index))
+        print('  Origin:   {}'.format(self.origin))
+        print('  Target:   {}'.format(self.target()))
+        print('  Face:     {}'.format(self.face))
+        print('  Prev:     {}'.format(self.prev))
+        print('  Next:     {}'.format(self.next))
+        print('  Main:     {}'.format(self.main))
+        print('  Cut:      {}'.format(H_TYPE[self.type]))
+
+
+
+
+class VertexRef:
+    """
+    Handle to a vertex of an ArrayGraph
+    """
+    __slots__=('graph','index')
+    def __init__(self,graph,index):
+        self.graph=graph
+        self.index=index
+
+
+    def __eq__(self,other):
+        return type(other) is VertexRef and other.index==self.index and other.graph is self.graph
+
+
+    def __hash__(self):
+        return hash(('v',self.index))
+
+
+    def __str__(self):
+        return 'v({0})'.format(self.index)
+
+
+    def __repr__(self):
+        return 'v({0})'.format(self.index)
+
+
+    @property
+    def halfedge(self):
+        i=self.graph.v_halfedge.item(self.index)
+        return None if i==NONE else HalfEdgeRef(self.graph,i)
+
+    @halfedge.setter
+    def halfedge(self,h):
+        self.graph.v_halfedge[self.index]=NONE if h is None else h.index
+
+
+    @property
+    def vector(self):
+        """
+        vector of the vertex (a copy of its row in coords)
+        """
+        return self.graph.coords[self.index].copy()
+
+    @vector.setter
+    def vector(self,vec):
+        self.graph.coords[self.index]=vec
+
+
+    @property
+    def sign(self):
+        return self.graph.v_sign.item(self.index)
+
+    @sign.setter
+    def sign(self,s):
+        self.graph.v_sign[self.index]=s
+
+
+    def couple(self,he):
+        self.halfedge=he
+        he.origin=self
+
+
+    def check_coupling(self):
+        g=self.graph
+        he=g.v_halfedge.item(self.index)
+        if he!=NONE:
+            h=he
+            while True:
+                if g.he_origin[h]!=self.index:
+                    return False
+                h=int(g.he_twin[g.he_prev[h]])
+                if h==he:
+                    break
+        return True
+
+
+    def get_face_list(self):
+        return [FaceRef(self.graph,i) for i in self.graph.faces_around(self.index)]
+
+
+    def info(self):
+        print('Vertex')
+        print('  Index:    {}'.format(self.index))
+        print('  Halfedge: {}'.format(self.halfedge))
+        print('  Vector:   {}'.format(self.vector))
+        print('  Sign:     {}'.format(V_SIGN[self.sign]))
+
+
+
+
+class FaceRef:
+    """
+    Handle to a face of an ArrayGraph
+    """
+    __slots__=('graph','index')
+    def __init__(self,graph,index):
+        self.graph=graph
+        self.index=index
+
+
+    def __eq__(self,other):
+        return type(other) is FaceRef and other.index==self.index and other.graph is self.graph
+
+
+    def __hash__(self):
+        return hash(('f',self.index))
+
+
+    def __str__(self):
+        return 'f({0})'.format(self.index)
+
+
+    def __repr__(self):
+        return 'f({0})'.format(self.index)
+
+
+    @property
+    def halfedge(self):
+        i=self.graph.f_halfedge.item(self.index)
+        return None if i==NONE else HalfEdgeRef(self.graph,i)
+
+    @halfedge.setter
+    def halfedge(self,h):
+        self.graph.f_halfedge[self.index]=NONE if h is None else h.index
+
+
+    @property
+    def valid(self):
+        return bool(self.graph.f_valid[self.index])
+
+    @valid.setter
+    def valid(self,b):
+        self.graph.f_valid[self.index]=b
+
+
+    @property
+    def component_index(self):
+        return self.graph.f_comp.item(self.index)
+
+    @component_index.setter
+    def component_index(self,i):
+        self.graph.f_comp[self.index]=i
+
+
+    def couple(self,he):
+        self.halfedge=he
+        he.face=self
+
+
+    def check_coupling(self):
+        g=self.graph
+        he=g.f_halfedge.item(self.index)
+        h=he
+        while True:
+            if g.he_face[h]!=self.index:
+                return False
+            h=g.he_next.item(h)
+            if h==he:
+                break
+        return True
+
+
+    def get_vertex_list(self):
+        return [VertexRef(self.graph,i) for i in self.graph.vertices_around(self.index)]
+
+
+    def get_neighbors(self,test_index=0,set_index=1):
+        g=self.graph
+        nlist=[]
+        he=g.f_halfedge.item(self.index)
+        if he==NONE:
+            return nlist
+        h=he
+        while True:
+            f=int(g.he_face[g.he_twin[h]])
+            if g.f_comp[f]==test_index:
+                g.f_comp[f]=set_index
+                nlist.append(FaceRef(g,f))
+            h=g.he_next.item(h)
+            if h==he:
+                break
+        return nlist
+
+
+    def info(self):
+        print('Face')
+        print('  Index:           {}'.format(self.index))
+        print('  Halfedge:        {}'.format(self.halfedge))
+        print('  component_index: {}:'.format(self.component_index))
+
+
+
+
+class ArrayGraph(Graph):
+    """
+    Implements a doubly-connected half-edge list in struct-of-arrays layout
+
+        halfedges: he_origin, he_face, he_twin, he_next, he_prev, he_type
+        vertices:  v_halfedge, v_sign, coords (one row per vertex)
+        faces:     f_halfedge, f_valid, f_comp
+
+    The two halfedges of an edge have the ids 2k and 2k+1, the even one is
+    the main halfedge. Removed elements are marked in the alive arrays and
+    their ids are recycled via free lists, so ids of living elements are
+    stable.
+    """
+    def __init__(self,dim,capacity=64): # initialize as simplex
+        if dim!=2 and dim!=3:
+            print('dim must be 2 or 3')
+            exit(1)
+        self.dim=dim
+        self.comp_he=[]
+
+        self.he_origin=np.full(2*capacity,NONE,dtype=np.int32)
+        self.he_face=np.full(2*capacity,NONE,dtype=np.int32)
+        self.he_twin=np.full(2*capacity,NONE,dtype=np.int32)
+        self.he_next=np.full(2*capacity,NONE,dtype=np.int32)
+        self.he_prev=np.full(2*capacity,NONE,dtype=np.int32)
+        self.he_type=np.zeros(2*capacity,dtype=np.int8)
+        self.he_alive=np.zeros(2*capacity,dtype=bool)
+        self.n_he=0       # number of used halfedge ids
+        self.free_he=[]   # free main halfedge ids
+
+        self.v_halfedge=np.full(capacity,NONE,dtype=np.int32)
+        self.v_sign=np.zeros(capacity,dtype=np.int8)
+        self.v_alive=np.zeros(capacity,dtype=bool)
+        self.coords=np.zeros((capacity,dim))
+        self.n_v=0
+        self.free_v=[]
+
+        self.f_halfedge=np.full(capacity,NONE,dtype=np.int32)
+        self.f_valid=np.zeros(capacity,dtype=bool)
+        self.f_comp=np.zeros(capacity,dtype=np.int32)
+        self.f_alive=np.zeros(capacity,dtype=bool)
+        self.n_f=0
+        self.free_f=[]
+        self.added=[0,0,0] # number of vertices, edges and faces added so far
+
+        if dim==3:
+            v0,v1,v2,v3=[self.__add_vertex() for i in range(4)]
+            f0,f1,f2,f3=[self.__add_face() for i in range(4)]
+            self.__add_edge(v0,v1,f3,f2)
+            self.__add_edge(v1,v2,f3,f0)
+            self.__add_edge(v2,v0,f3,f1)
+            self.__add_edge(v1,v3,f0,f2)
+            self.__add_edge(v3,v2,f0,f1)
+            self.__add_edge(v0,v3,f2,f1)
+        else:
+            v0,v1,v2=[self.__add_vertex() for i in range(3)]
+            f0,f1=[self.__add_face() for i in range(2)]
+            self.__add_edge(v0,v1,f0,f1)
+            self.__add_edge(v1,v2,f0,f1)
+            self.__add_edge(v2,v0,f0,f1)
+            self.f_valid[f1]=False
+        self.__set_prev_next_for_each_halfedge()
+
+
+    def __set_prev_next_for_each_halfedge(self):
+        """
+        slow, for small instances only
+        """
+        hes=np.flatnonzero(self.he_alive[0:self.n_he])
+        for h in hes:
+            for g in hes:
+                if self.he_face[h]==self.he_face[g] and self.he_origin[self.he_twin[h]]==self.he_origin[g]:
+                    self.he_prev[g]=h
+                    self.he_next[h]=g
+                    break
+
+    # ---------------------------------------------------------------
+    # element lists (handles of living elements, ordered by id)
+    # ---------------------------------------------------------------
+
+    @property
+    def edges(self):
+        ids=2*np.flatnonzero(self.he_alive[0:self.n_he:2])
+        return [HalfEdgeRef(self,i) for i in ids.tolist()]
+
+
+    @property
+    def vertices(self):
+        return [VertexRef(self,i) for i in self.vertex_ids().tolist()]
+
+
+    @property
+    def faces(self):
+        return [FaceRef(self,i) for i in np.flatnonzero(self.f_alive[0:self.n_f]).tolist()]
+
+
+    def vertex_ids(self):
+        return np.flatnonzero(self.v_alive[0:self.n_v])
+
+
+    def __str__(self):
+        return 'ArrayGraph:\n Halfedges: {0} \n Vertices: {1} \n Faces: {2}'.format(self.edges,self.vertices,self.faces)
+
+
+    def __repr__(self):
+        return self.__str__()
+
+    # ---------------------------------------------------------------
+    # allocation
+    # ---------------------------------------------------------------
+
+    def __add_edge(self,origin,target,face_cw,face_ccw):
+        """
+        add edge to graph
+            prev and next to be set manually
+        """
+        if self.free_he:
+            he1=self.free_he.pop()
+        else:
+            if self.n_he+2>self.he_alive.shape[0]:
+                n=2*self.he_alive.shape[0]
+                self.he_origin=_grow(self.he_origin,n,NONE)
+                self.he_face=_grow(self.he_face,n,NONE)
+                self.he_twin=_grow(self.he_twin,n,NONE)
+                self.he_next=_grow(self.he_next,n,NONE)
+                self.he_prev=_grow(self.he_prev,n,NONE)
+                self.he_type=_grow(self.he_type,n,0)
+                self.he_alive=_grow(self.he_alive,n,False)
+            he1=self.n_he
+            self.n_he+=2
+        he2=he1+1
+        self.added[1]+=1
+        self.he_alive[he1:he1+2]=True
+        self.he_type[he1:he1+2]=0
+        self.he_twin[he1]=he2
+        self.he_twin[he2]=he1
+        self.he_next[he1:he1+2]=NONE
+        self.he_prev[he1:he1+2]=NONE
+        self.he_origin[he1]=origin
+        self.he_origin[he2]=target
+        self.v_halfedge[origin]=he1
+        self.v_halfedge[target]=he2
+        self.he_face[he1]=face_cw
+        self.he_face[he2]=face_ccw
+        self.f_halfedge[face_cw]=he1
+        self.f_halfedge[face_ccw]=he2
+        return he1, he2
+
+
+    def __kill_edge(self,he):
+        """
+        dirty removal of edge
+        """
+        he=he & ~1
+        self.he_alive[he:he+2]=False
+        self.free_he.append(he)
+
+
+    def __add_vertex(self):
+        """
+        add vertex to graph
+        """
+        if self.free_v:
+            v=self.free_v.pop()
+        else:
+            if self.n_v==self.v_alive.shape[0]:
+                n=2*self.n_v
+                self.v_halfedge=_grow(self.v_halfedge,n,NONE)
+                self.v_sign=_grow(self.v_sign,n,0)
+                self.v_alive=_grow(self.v_alive,n,False)
+                self.coords=_grow(self.coords,n,0)
+            v=self.n_v
+            self.n_v+=1
+        self.added[0]+=1
+        self.v_alive[v]=True
+        self.v_halfedge[v]=NONE
+        self.v_sign[v]=0
+        return v
+
+
+    def __remove_vertex(self,v):
+        """
+        remove vertex from graph
+        """
+        if self.v_halfedge[v]==NONE:
+            self.v_alive[v]=False
+            self.free_v.append(v)
+        else:
+            print('Illegal removal of vertex')
+            exit(1)
+
+
+    def __add_face(self):
+        """
+        add face to graph
+        """
+        if self.free_f:
+            f=self.free_f.pop()
+        else:
+            if self.n_f==self.f_alive.shape[0]:
+                n=2*self.n_f
+                self.f_halfedge=_grow(self.f_halfedge,n,NONE)
+                self.f_valid=_grow(self.f_valid,n,False)
+                self.f_comp=_grow(self.f_comp,n,0)
+                self.f_alive=_grow(self.f_alive,n,False)
+            f=self.n_f
+            self.n_f+=1
+        self.added[2]+=1
+        self.f_alive[f]=True
+        self.f_halfedge[f]=NONE
+        self.f_valid[f]=True
+        self.f_comp[f]=0
+        return f
+
+
+    def __remove_face(self,f):
+        """
+        remove face from graph
+        """
+        if self.f_halfedge[f]==NONE:
+            self.f_alive[f]=False
+            self.f_comp[f]=0
+            self.free_f.append(f)
+        else:
+            print('Illegal removal of face')
+            exit(1)
+
+
+    def __merge_faces(self,f1,f2):
+        he=self.f_halfedge.item(f2)
+        self.f_halfedge[f1]=NONE # to be set manually
+        self.f_halfedge[f2]=NONE
+        h=he
+        while True:
+            self.he_face[h]=f1
+            h=self.he_next.item(h)
+            if h==he:
+                break
+        self.f_valid[f1]=self.f_valid[f1] and self.f_valid[f2]
+        self.__remove_face(f2)
+
+
+    def __link(self,h,g):
+        """
+        h is followed by g
+        """
+        self.he_next[h]=g
+        self.he_prev[g]=h
+
+    # ---------------------------------------------------------------
+    # graph operations (same semantics as in Graph)
+    # ---------------------------------------------------------------
+
+    def split_edge(self,uw):
+        """
+        clean split edge
+        splits uw into edges uv and vw
+        """
+        uv,vw=self.split_edge_id(uw.index)
+        return HalfEdgeRef(self,uv),HalfEdgeRef(self,vw)
+
+
+    def split_edge_id(self,uw):
+        wu=self.he_twin.item(uw)
+        u=self.he_origin.item(uw)
+        v=self.__add_vertex() # new vertex
+
+        # new edge uv
+        uv,vu=self.__add_edge(u,v,self.he_face[uw],self.he_face[wu])
+        self.v_halfedge[u]=uv
+
+        # edge uw changed to vw
+        vw=uw
+        wv=wu
+        self.v_halfedge[v]=vw
+        self.he_origin[vw]=v
+
+        if self.he_prev[uw]==wu:
+            self.__link(vu,uv)
+        else:
+            tmp1=self.he_prev.item(uw)
+            tmp2=self.he_next.item(wu)
+            self.__link(tmp1,uv)
+            self.__link(vu,tmp2)
+        self.__link(uv,vw)
+        self.__link(wv,vu)
+        return uv,vw
+
+
+    def split_face(self,he1,he2):
+        """
+        clean splitting of face
+        """
+        self.split_face_id(he1.index,he2.index)
+
+
+    def split_face_id(self,he1,he2):
+        if self.he_twin[he1]!=he2 and self.he_next[he2]!=he1 and self.he_next[he1]!=he2: # no parallel edges
+            u=self.he_origin.item(he1)
+            w=self.he_origin.item(he2)
+            if u!=w:
+                f1=self.he_face.item(he1)
+                f2=self.__add_face()
+                uw,wu=self.__add_edge(u,w,f2,f1)
+
+                tmp1=self.he_prev.item(he1)
+                tmp2=self.he_prev.item(he2)
+                self.__link(tmp1,uw)
+                self.__link(uw,he2)
+                self.__link(tmp2,wu)
+                self.__link(wu,he1)
+
+                h=he2
+                while True:
+                    self.he_face[h]=f2
+                    h=self.he_next.item(h)
+                    if h==uw:
+                        break
+
+
+    def remove_edge(self,he):
+        """
+        clean removal of edge
+        """
+        self.remove_edge_id(he.index)
+
+
+    def remove_edge_id(self,he):
+        tw=self.he_twin.item(he)
+        f1=self.he_face.item(he)
+        f2=self.he_face.item(tw)
+        o=self.he_origin.item(he)
+        t=self.he_origin.item(tw)
+        on=self.he_next.item(tw)
+        op=self.he_prev.item(he)
+        tn=self.he_next.item(he)
+        tp=self.he_prev.item(tw)
+
+        if f1!=f2:
+            self.__merge_faces(f2,f1)   # f2 survives
+            f1=f2
+        elif tp==he and op==tw:
+            self.he_face[he]=NONE
+            self.he_face[tw]=NONE
+            self.f_halfedge[f2]=NONE
+            self.__remove_face(f2)
+        elif op!=tw and tp!=he:
+            # split graph by inserting a new face
+            f1=self.__add_face()
+            h=on
+            self.he_face[h]=f1
+            while True:
+                h=self.he_next.item(h)
+                self.he_face[h]=f1
+                if h==op:
+                    break
+
+        if tp==he: # t is incident to he.twin only
+            self.v_halfedge[t]=NONE
+            self.he_origin[tw]=NONE
+            self.__remove_vertex(t)
+        else:
+            self.__link(tp,tn)
+            self.__link(he,tw)
+            self.f_halfedge[f2]=tp
+            self.v_halfedge[t]=tn
+        if op==tw: # o is incident to he only
+            self.v_halfedge[o]=NONE
+            self.he_origin[he]=NONE
+            self.__remove_vertex(o)
+        else:
+            self.__link(op,on)
+            self.__link(tw,he)
+            self.f_halfedge[f1]=op
+            self.v_halfedge[o]=on
+        self.__kill_edge(he)
+
+    # ---------------------------------------------------------------
+    # traversal
+    # ---------------------------------------------------------------
+
+    def vertices_around(self,f):
+        """
+        ids of the vertices along the boundary of face f
+        """
+        vlist=[]
+        he=self.f_halfedge.item(f)
+        if he==NONE:
+            print('This should not happen')
+            return vlist
+        h=he
+        while True:
+            vlist.append(self.he_origin.item(h))
+            h=self.he_next.item(h)
+            if h==he:
+                break
+        return vlist
+
+
+    def faces_around(self,v):
+        """
+        ids of the faces incident to vertex v
+        """
+        flist=[]
+        he=self.v_halfedge.item(v)
+        if he==NONE:
+            return flist
+        h=he
+        while True:
+            flist.append(self.he_face.item(h))
+            h=int(self.he_next[self.he_twin[h]])
+            if h==he:
+                break
+        return flist
+
+
+    def find_components(self):
+        """
+        Computes the components of a graph
+        """
+        self.comp_he=[]
+        self.f_comp[:]=0
+        i=0
+        for f in np.flatnonzero(self.f_alive[0:self.n_f]):
+            if self.f_comp[f]!=0:
+                continue
+            i+=1
+            self.comp_he.append(HalfEdgeRef(self,self.f_halfedge.item(f))) # store one halfedge for each component
+            self.f_comp[f]=i
+            queue=[FaceRef(self,int(f))]
+            while queue!=[]:
+                g=queue.pop()
+                queue.extend(g.get_neighbors(test_index=0,set_index=i))
+
+
+    def size_of_component(self,i):
+        return int(np.count_nonzero(self.f_alive[0:self.n_f] & (self.f_comp[0:self.n_f]==i)))
+
+    # ---------------------------------------------------------------
+    # vectorized passes
+    # ---------------------------------------------------------------
+
+    def number_of_vertices(self):
+        return self.n_v-len(self.free_v)
+
+
+    def size(self):
+        """
+        numbers of vertices, edges and faces
+        """
+        return self.n_v-len(self.free_v),self.n_he//2-len(self.free_he),self.n_f-len(self.free_f)
+
+
+    def get_coords(self):
+        """
+        vectors of all vertices (in the order of self.vertices) as array
+        """
+        return self.coords[self.vertex_ids()]
+
+
+    def coords_of(self,v):
+        """
+        vector of the vertex v as view of its row in coords (no copy), 
+        valid until the graph is changed
+        """
+        return self.coords[v.index]
+
+
+    def set_v_signs(self,signs):
+        """
+        sets the V_SIGN of each vertex, signs in the order of self.vertices
+        """
+        self.v_sign[self.vertex_ids()]=signs
+
+
+    def set_h_types(self):
+        """
+        sets the H-TYPE of each halfedge from the signs of its vertices
+        """
+        n=self.n_he
+        alive=self.he_alive[0:n]
+        origin=np.where(alive,self.he_origin[0:n],0)
+        target=origin[self.he_twin[0:n].clip(0)]
+        types=3*self.v_sign[origin]+self.v_sign[target]
+        self.he_type[0:n]=np.where(alive,types,0)
+
+
+    def split_edges(self,point,hlist=None):
+        """
+        splits the -+ halfedges in hlist (default: all -+ halfedges) at 
+        point(u,w), u and w the vectors of origin and target, the new 
+        vertices get V_SIGN 0 and the halfedges the H-TYPES -0,0-,0+,+0,
+        returns the new vertices
+        """
+        if hlist is None:
+            ids=self.halfedge_ids_of_type(5).tolist() # -+
+        else:
+            ids=[h.index for h in hlist]
+        vlist=[]
+        for uw in ids:
+            u_vec=self.coords[self.he_origin.item(uw)]
+            w_vec=self.coords[self.he_origin.item(self.he_twin.item(uw))]
+            vec=point(u_vec,w_vec)
+            uv,vw=self.split_edge_id(uw)
+            v=self.he_origin.item(vw)
+            self.coords[v]=vec
+            self.v_sign[v]=0                      # 0
+            self.he_type[uv]=3                    # -0
+            self.he_type[self.he_twin.item(uv)]=1 # 0-
+            self.he_type[vw]=2                    # 0+
+            self.he_type[self.he_twin.item(vw)]=6 # +0
+            vlist.append(VertexRef(self,v))
+        return vlist
+
+
+    def cut(self):
+        """
+        cut off "+"-part of graph and draw cycles along the cut, the +0 
+        halfedges, "+"-vertices and faces of degree 2 are selected on the 
+        arrays
+        """
+        self.draw_cuts([HalfEdgeRef(self,h) for h in self.halfedge_ids_of_type(6,valid=True).tolist()]) # +0
+        
+        # remove V_+
+        for v in self.vertex_ids_of_sign(2).tolist():
+            while self.v_halfedge.item(v)!=NONE:
+                self.remove_edge_id(self.v_halfedge.item(v))
+                
+        for f in self.face_ids_of_degree(2).tolist():
+            self.remove_edge_id(self.f_halfedge.item(f))
+
+
+    def climb(self,v,hp):
+        """
+        hill climbing along the edges of the graph from the vertex v to a 
+        vertex maximizing hp @ vector, returns the vertex and its value
+        """
+        v=v.index
+        val=hp @ self.coords[v]
+        while True:
+            best=None
+            he=self.v_halfedge.item(v)
+            h=he
+            while h!=NONE: # halfedges with origin v
+                tw=self.he_twin.item(h)
+                w=self.he_origin.item(tw)
+                res=hp @ self.coords[w]
+                if res>val:
+                    best=w
+                    val=res
+                h=self.he_next.item(tw)
+                if h==he:
+                    break
+            if best==None:
+                return VertexRef(self,v),val
+            v=best
+
+
+    def halfedge_ids_of_type(self,t,valid=False):
+        """
+        ids of the halfedges of H-TYPE t (increasing), valid: only halfedges
+        of edges whose main halfedge lies in a valid face
+        """
+        n=self.n_he
+        ids=np.flatnonzero(self.he_alive[0:n] & (self.he_type[0:n]==t))
+        if valid:
+            ids=ids[self.f_valid[self.he_face[ids & ~1]]]
+        return ids
+
+
+    def vertex_ids_of_sign(self,s):
+        """
+        ids of the vertices of V_SIGN s (increasing)
+        """
+        ids=self.vertex_ids()
+        return ids[self.v_sign[ids]==s]
+
+
+    def get_bridges(self):
+        ids=2*np.flatnonzero(self.he_alive[0:self.n_he:2])
+        ids=ids[self.he_face[ids]==self.he_face[ids+1]]
+        return [HalfEdgeRef(self,i) for i in ids.tolist()]
+
+
+    def get_vertices_of_degree(self,deg):
+        ids=self.vertex_ids()
+        hes=self.v_halfedge[ids]
+        if deg==0:
+            return [VertexRef(self,i) for i in ids[hes==NONE].tolist()]
+        ids=ids[hes!=NONE]
+        he=hes[hes!=NONE]
+        h=he
+        for d in range(deg):
+            h=self.he_twin[self.he_prev[h]]
+        return [VertexRef(self,i) for i in ids[h==he].tolist()]
+
+
+    def get_faces_of_degree(self,deg):
+        return [FaceRef(self,i) for i in self.face_ids_of_degree(deg).tolist()]
+
+
+    def face_ids_of_degree(self,deg):
+        """
+        ids of the faces with deg halfedges (increasing)
+        """
+        ids=np.flatnonzero(self.f_alive[0:self.n_f])
+        hes=self.f_halfedge[ids]
+        if deg==0:
+            return ids[hes==NONE]
+        ids=ids[hes!=NONE]
+        he=hes[hes!=NONE]
+        h=he
+        for d in range(deg):
+            h=self.he_next[h]
+        return ids[h==he]
+
+
+    def nbytes(self):
+        """
+        memory used by the arrays in bytes
+        """
+        arrays=[self.he_origin,self.he_face,self.he_twin,self.he_next,self.he_prev,self.he_type,self.he_alive,
+                self.v_halfedge,self.v_sign,self.v_alive,self.coords,
+                self.f_halfedge,self.f_valid,self.f_comp,self.f_alive]
+        return sum(a.nbytes for a in arrays)
+
+    # ---------------------------------------------------------------
+    # snapshots (same format as in Graph)
+    # ---------------------------------------------------------------
+
+    def to_arrays(self):
+        """
+        returns the graph as dict of arrays with consecutive numbers of the
+        living elements, see Graph.to_arrays()
+        """
+        vnum=np.cumsum(self.v_alive[0:self.n_v])-1
+        fnum=np.cumsum(self.f_alive[0:self.n_f])-1
+        hnum=np.repeat(2*(np.cumsum(self.he_alive[0:self.n_he:2])-1),2)+np.tile([0,1],self.n_he//2)
+        hes=np.flatnonzero(self.he_alive[0:self.n_he])
+        vs=self.vertex_ids()
+        fs=np.flatnonzero(self.f_alive[0:self.n_f])
+        def hid(a):
+            return np.where(a==NONE,-1,hnum[a])
+        he=np.stack((vnum[self.he_origin[hes]],fnum[self.he_face[hes]],
+                     hid(self.he_next[hes]),hid(self.he_prev[hes])),axis=1).astype(np.int64)
+        return {'coords':self.coords[vs].copy(),
+                'v_sign':self.v_sign[vs].copy(),
+                'v_halfedge':hid(self.v_halfedge[vs]).astype(np.int64),
+                'he':he,
+                'he_type':self.he_type[hes].copy(),
+                'f_halfedge':hid(self.f_halfedge[fs]).astype(np.int64),
+                'f_valid':self.f_valid[fs].copy()}
+
+
+    @classmethod
+    def from_arrays(cls,arrays):
+        """
+        returns a new graph with the elements given by to_arrays()
+        """
+        g=cls.__new__(cls)
+        g.dim=arrays['coords'].shape[1]
+        g.comp_he=[]
+        nh=arrays['he'].shape[0]
+        he=arrays['he'].astype(np.int32)
+        g.he_origin=he[:,0].copy()
+        g.he_face=he[:,1].copy()
+        g.he_twin=np.arange(nh,dtype=np.int32)^1
+        g.he_next=he[:,2].copy()
+        g.he_prev=he[:,3].copy()
+        g.he_type=arrays['he_type'].astype(np.int8)
+        g.he_alive=np.ones(nh,dtype=bool)
+        g.n_he=nh
+        g.free_he=[]
+        g.coords=arrays['coords'].copy()
+        g.v_halfedge=arrays['v_halfedge'].astype(np.int32)
+        g.v_sign=arrays['v_sign'].astype(np.int8)
+        g.v_alive=np.ones(g.coords.shape[0],dtype=bool)
+        g.n_v=g.coords.shape[0]
+        g.free_v=[]
+        g.f_halfedge=arrays['f_halfedge'].astype(np.int32)
+        g.f_valid=arrays['f_valid'].astype(bool)
+        g.f_comp=np.zeros(g.f_valid.shape[0],dtype=np.int32)
+        g.f_alive=np.ones(g.f_valid.shape[0],dtype=bool)
+        g.n_f=g.f_valid.shape[0]
+        g.free_f=[]
+        g.added=list(g.size())
+        return g
+
+    # ---------------------------------------------------------------
+    # output
+    # ---------------------------------------------------------------
+
+    def export_to_off(self,filename='graph.off'):
+        """
+        write result to OFF-file
+        """
+        ids=self.vertex_ids()
+        number=np.cumsum(self.v_alive[0:self.n_v])-1 # consecutive vertex numbers
+        faces=np.flatnonzero(self.f_alive[0:self.n_f] & self.f_valid[0:self.n_f])
+        file1 = open(filename, 'w')
+        file1.write('OFF\n\n')
+        file1.write('{0} {1} {2}\n'.format(len(ids),len(faces),len(self.edges)))
+        for v in ids:
+            vec=self.coords[v]
+            if self.dim==3:
+                file1.write("{0} {1} {2}\n".format(vec[0],vec[1],vec[2]))
+            else:
+                file1.write("{0} {1} {2}\n".format(vec[0],vec[1],0))
+        for f in faces:
+            verts=self.vertices_around(f)
+            file1.write("{} ".format(len(verts)))
+            for v in verts:
+                file1.write("{} ".format(number[v]))
+            if self.f_comp[f]>1:
+                seed(self.f_comp.item(f))
+                r=random()
+                g=random()
+                b=random()
+                file1.write(" {0} {1} {2} 0.2".format(r,g,b))
+            else:
+                file1.write(" 0.4 0.4 0.4 0.2")
+            file1.write("\n")
+        file1.close()
+
+
+    def kill(self):
+        self.he_alive[:]=False
+        self.v_alive[:]=False
+        self.f_alive[:]=False
+        self.n_he=0
+        self.n_v=0
+        self.n_f=0
+        self.free_he=[]
+        self.free_v=[]
+        self.free_f=[]
+        self.comp_he=[]
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+Runs a grid of (input file, eps, engine) jobs on a pool of processes
+
+    each input file is loaded and prepared once, its matrix is passed to the
+    workers via shared memory
+
+"""
+import numpy as np
+from multiprocessing import Pool
+from multiprocessing import shared_memory
+from Problem import Problem
+from GraphAlg import GraphAlg
+from ApproxDDM import ApproxDDM
+
+ENGINES={'GraphAlg':GraphAlg,'ApproxDDM':ApproxDDM}
+
+
+def _solve(filename,eps,engine,matrix,local):
+    """
+    solves the prepared problem given by matrix, returns a result dict
+    """
+    p=Problem(matrix=matrix,eps=eps,filename=filename)
+    p.dim=matrix.shape[1] # matrix is prepared already, no p.init()
+    a=ENGINES[engine](p)
+    if engine=='GraphAlg':
+        a.local=local
+        a.run()
+        result=(a.graph.number_of_vertices(),len(a.graph.faces))
+    else:
+        a.run()
+        result=(a.pool.size,len(a.facets))
+    return {'filename':filename,'eps':eps,'engine':engine,'time':a.time0,
+            'vertices':result[0],'faces':result[1]}
+
+
+def _run_job(job):
+    """
+    worker: attaches the shared matrix and solves
+    """
+    filename,eps,engine,name,shape,local=job
+    shm=shared_memory.SharedMemory(name=name)
+    try:
+        matrix=np.ndarray(shape,dtype=np.float64,buffer=shm.buf)
+        matrix.flags.writeable=False
+        return _solve(filename,eps,engine,matrix,local)
+    finally:
+        matrix=None
+        shm.close()
+
+
+def run_batch(jobs,processes=None,local=False):
+    """
+    runs the jobs (filename, eps, engine) on a pool of processes (default:
+    number of cores), engine is 'GraphAlg' or 'ApproxDDM', returns the list
+    of result dicts with the keys filename, eps, engine, time, vertices and
+    faces in the order of jobs
+        ApproxDDM jobs of 2-dimensional problems are skipped (result None)
+    """
+    for filename,eps,engine in jobs:
+        if engine not in ENGINES:
+            print('engine must be one of {}'.format(list(ENGINES)))
+            exit(1)
+    shms={}
+    try:
+        tasks=[]
+        for filename,eps,engine in jobs:
+            if filename not in shms:
+                p=Problem(filename=filename)
+                p.init()
+                A=np.ascontiguousarray(p.matrix,dtype=np.float64)
+                shm=shared_memory.SharedMemory(create=True,size=A.nbytes)
+                np.ndarray(A.shape,dtype=np.float64,buffer=shm.buf)[:]=A
+                shms[filename]=(shm,A.shape)
+            shm,shape=shms[filename]
+            if engine=='ApproxDDM' and shape[1]!=3:
+                tasks.append(None)
+            else:
+                tasks.append((filename,eps,engine,shm.name,shape,local))
+        with Pool(processes) as pool:
+            results=pool.map(_run_job,[t for t in tasks if t is not None],chunksize=1)
+        results.reverse()
+        return [None if t is None else results.pop() for t in tasks]
+    finally:
+        for shm,shape in shms.values():
+            shm.close()
+            shm.unlink()
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+Limits of a run of GraphAlg or ApproxDDM, see run() of the engines
+
+    time_limit : wall-clock time in seconds
+    max_rows   : number of rows processed
+    callback   : function callback(engine) called before each row, e.g. to
+                 report progress (engine.iter of engine.matrix.shape[0] rows),
+                 the run stops if it returns True
+    cancel     : cancellation token, an object with a method is_set(), e.g.
+                 threading.Event, the run stops if it is set
+
+    a stopped run keeps its state, it can be inspected and continued by
+    calling run() again
+
+"""
+from time import perf_counter
+
+
+class Budget:
+    """
+    Implements the limits of one call of run()
+    """
+    def __init__(self,time_limit=None,max_rows=None,callback=None,cancel=None):
+        self.time_limit=time_limit
+        self.max_rows=max_rows
+        self.callback=callback
+        self.cancel=cancel
+        self.rows=0 # rows processed so far
+        self.start=perf_counter()
+
+
+    def check(self,engine):
+        """
+        called before each row, returns None if the row may be processed,
+        otherwise the reason for stopping: 'cancel', 'rows', 'time' or 'callback'
+        """
+        if self.cancel is not None and self.cancel.is_set():
+            return 'cancel'
+        if self.max_rows is not None and self.rows>=self.max_rows:
+            return 'rows'
+        if self.time_limit is not None and perf_counter()-self.start>=self.time_limit:
+            return 'time'
+        if self.callback is not None and self.callback(engine):
+            return 'callback'
+        self.rows+=1
+        return None
@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+"""
+Content-addressed on-disk cache of the results of GraphAlg and ApproxDDM
+
+    key  : hash of the input rows and the parameters (engine, eps and the
+           settings local, block, order, seed, pertubation1, pertubation2),
+           the input rows are the content of the csv file, or the matrix if
+           given, or the prepared matrix if the problem is initialized
+           already, so a hit needs neither Problem.init() nor a run,
+           problems with an oracle (Problem.oracle) are not cached
+
+    entry: directory <key> with
+        vertices.npy : vertices (nodes) as rows
+        faces.npy    : vertex indices of all faces (facets), concatenated
+        face_ptr.npy : faces.npy[face_ptr[i]:face_ptr[i+1]] are the
+                       vertices of face i
+        info.json    : engine, eps, settings, times, sizes and input file
+    arrays are memory mapped when read
+
+    the size of the cache is bounded by max_bytes, the least recently used
+    entries are removed first (use time: modification time of the entry)
+
+"""
+import numpy as np
+import os
+import json
+import hashlib
+import shutil
+from sys import exit
+from GraphAlg import GraphAlg
+from ApproxDDM import ApproxDDM
+
+SETTINGS=['local','block','order','seed','pertubation1','pertubation2']
+
+
+def graph_faces(arrays):
+    """
+    returns the vertex indices of the valid faces of a graph given by
+    to_arrays() as list of lists
+    """
+    origin=arrays['he'][:,0].tolist()
+    nxt=arrays['he'][:,2].tolist()
+    faces=[]
+    for h0,valid in zip(arrays['f_halfedge'].tolist(),arrays['f_valid'].tolist()):
+        if not valid or h0<0:
+            continue
+        face=[]
+        h=h0
+        while True:
+            face.append(origin[h])
+            h=nxt[h]
+            if h==h0:
+                break
+        faces.append(face)
+    return faces
+
+
+class Result:
+    """
+    Result read from the cache
+        vertices: vertices (nodes) as rows, faces: list of vertex index
+        arrays, info: dict of info.json, time0: time of the original run
+    """
+    def __init__(self,path):
+        self.vertices=np.load(os.path.join(path,'vertices.npy'),mmap_mode='r')
+        self.face_flat=np.load(os.path.join(path,'faces.npy'),mmap_mode='r')
+        self.face_ptr=np.load(os.path.join(path,'face_ptr.npy'),mmap_mode='r')
+        with open(os.path.join(path,'info.json')) as f:
+            self.info=json.load(f)
+        self.time0=self.info['time']
+
+
+    @property
+    def faces(self):
+        p=self.face_ptr
+        return [self.face_flat[p[i]:p[i+1]] for i in range(len(p)-1)]
+
+
+
+
+class ResultCache:
+    """
+    Implements the cache in the directory directory
+    """
+    def __init__(self,directory='ave_cache',max_bytes=256*2**20):
+        self.directory=directory
+        self.max_bytes=max_bytes
+        self.hits=0
+        self.misses=0
+
+
+    def key(self,problem,engine='GraphAlg',**settings):
+        """
+        returns the key of problem solved by engine with settings, see SETTINGS
+        """
+        if problem.oracle is not None:
+            print('ResultCache: results of problems with an oracle are not cached')
+            exit(1)
+        for k in settings:
+            if k not in SETTINGS:
+                print('ResultCache: setting must be one of {}'.format(SETTINGS))
+                exit(1)
+        h=hashlib.sha256()
+        if problem.dim>0: # initialized
+            h.update(b'prepared')
+            h.update(str(problem.matrix.shape).encode())
+            h.update(np.ascontiguousarray(problem.matrix,dtype=float).tobytes())
+        elif problem.matrix is not None:
+            A=np.array(problem.matrix,dtype=float)
+            h.update(b'rows')
+            h.update(str(A.shape).encode())
+            h.update(A.tobytes())
+        else:
+            h.update(b'file')
+            with open(problem.filename,'rb') as f:
+                for block in iter(lambda: f.read(1<<20),b''):
+                    h.update(block)
+        params={'engine':engine,'eps':float(problem.eps)}
+        params.update(settings)
+        h.update(json.dumps(params,sort_keys=True).encode())
+        return h.hexdigest()
+
+
+    def get(self,key):
+        """
+        returns the Result of key or None, a hit updates the use time
+        """
+        path=os.path.join(self.directory,key)
+        if not os.path.exists(os.path.join(path,'info.json')):
+            self.misses+=1
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits+=1
+        return Result(path)
+
+
+    def put(self,key,engine,info=None):
+        """
+        stores the result of the finished run of engine (GraphAlg or
+        ApproxDDM) under key, returns it as Result
+        """
+        if isinstance(engine,GraphAlg):
+            arrays=engine.graph.to_arrays()
+            vertices=arrays['coords']
+            faces=graph_faces(arrays)
+        else:
+            vertices=engine.pool.get_coords()
+            faces=[[n.index for n in f.node_list] for f in engine.facets]
+        ptr=np.zeros(len(faces)+1,dtype=np.int64)
+        ptr[1:]=np.cumsum([len(f) for f in faces])
+        flat=np.array([i for f in faces for i in f],dtype=np.int64)
+        d={'engine':type(engine).__name__,'eps':engine.eps,'filename':engine.problem.filename,
+           'time':engine.time0,'times':[engine.time1,engine.time2,engine.time3,engine.time4],
+           'vertices':vertices.shape[0],'faces':len(faces)}
+        if info is not None:
+            d.update(info)
+        os.makedirs(self.directory,exist_ok=True)
+        path=os.path.join(self.directory,key)
+        tmp='{0}.{1}.tmp'.format(path,os.getpid())
+        os.makedirs(tmp,exist_ok=True)
+        np.save(os.path.join(tmp,'vertices.npy'),vertices)
+        np.save(os.path.join(tmp,'faces.npy'),flat)
+        np.save(os.path.join(tmp,'face_ptr.npy'),ptr)
+        with open(os.path.join(tmp,'info.json'),'w') as f:
+            json.dump(d,f)
+        try:
+            os.rename(tmp,path)
+        except OSError: # stored by another process meanwhile
+            shutil.rmtree(tmp,ignore_errors=True)
+        self.evict(keep=key)
+        return Result(path)
+
+
+    def solve(self,problem,engine='GraphAlg',**settings):
+        """
+        returns the Result of problem solved by engine ('GraphAlg' or
+        'ApproxDDM') with settings (see SETTINGS) from the cache, the problem
+        is initialized and solved only if it is not in the cache
+        """
+        key=self.key(problem,engine,**settings)
+        r=self.get(key)
+        if r is not None:
+            return r
+        if problem.dim==0:
+            problem.init()
+        if engine=='GraphAlg':
+            a=GraphAlg(problem,seed=settings.get('seed',0))
+        elif engine=='ApproxDDM':
+            a=ApproxDDM(problem)
+        else:
+            print("engine must be 'GraphAlg' or 'ApproxDDM'")
+            exit(1)
+        for k,v in settings.items():
+            if k=='order':
+                a.set_order(v,settings.get('seed',0))
+            elif k!='seed':
+                setattr(a,k,v)
+        a.run()
+        return self.put(key,a,{'settings':settings})
+
+
+    def entries(self):
+        """
+        returns the list of (use time, bytes, path) of the entries
+        """
+        result=[]
+        if not os.path.isdir(self.directory):
+            return result
+        for name in os.listdir(self.directory):
+            path=os.path.join(self.directory,name)
+            if name.endswith('.tmp') or not os.path.isdir(path):
+                continue
+            try:
+                size=sum(e.stat().st_size for e in os.scandir(path))
+                result.append((os.stat(path).st_mtime,size,path))
+            except OSError: # removed by another process
+                pass
+        return result
+
+
+    def evict(self,keep=None):
+        """
+        removes the least recently used entries (except key keep) until
+        the cache has at most max_bytes
+        """
+        E=sorted(self.entries())
+        total=sum(e[1] for e in E)
+        for t,size,path in E:
+            if total<=self.max_bytes:
+                break
+            if os.path.basename(path)==keep:
+                continue
+            shutil.rmtree(path,ignore_errors=True)
+            total-=size
+
+
+    def clear(self):
+        shutil.rmtree(self.directory,ignore_errors=True)
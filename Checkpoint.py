@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+Checkpoints of GraphAlg and ApproxDDM
+
+    save(engine,filename) writes the state of an engine between two steps to
+    an .npz file of plain arrays (no pickling of linked objects),
+    load(filename) restores it, e.g. in a new process, and run() continues
+
+    GraphAlg : graph (see Graph.to_arrays()), matrix, iter, eps, pertubations
+               and random state, settings, skipped and oracle rows, times
+    ApproxDDM: nodes (vectors and ids) with the incidences as pairs (node
+               id, facet), facets, matrix, iter, eps, settings, skipped
+               rows, times
+
+    not saved: snapshots, recorder and the oracle of the problem (it can be
+    passed to load())
+
+"""
+import numpy as np
+import os
+import json
+from sys import exit
+from Problem import Problem
+from Problem import RowStream
+from Graph import Graph
+from ArrayGraph import ArrayGraph
+from GraphAlg import GraphAlg
+from ApproxDDM import ApproxDDM
+from ApproxDDM import NodePool
+from ApproxDDM import Facet
+
+GRAPH_CLASSES={'Graph':Graph,'ArrayGraph':ArrayGraph}
+
+
+def save(engine,filename,compress=False):
+    """
+    writes a checkpoint of engine to filename (atomically, the file is
+    replaced when complete), compress: zip compression, smaller but slower
+    """
+    if isinstance(engine.matrix,RowStream):
+        print('save(): the rows of a row stream are not kept')
+        exit(1)
+    d={'matrix':engine.matrix,
+       'filename':'' if engine.problem.filename is None else engine.problem.filename,
+       'iter':engine.iter,
+       'eps':engine.eps,
+       'block':engine.block,
+       'block_end':engine.block_end,
+       'active':np.array([] if engine.active is None else engine.active,dtype=bool),
+       'order':engine.order,
+       'skipped':np.array(engine.skipped,dtype=np.int64),
+       'peak':np.array([engine.peak_size,engine.peak_iter],dtype=np.int64),
+       'times':np.array([engine.time0,engine.time1,engine.time2,engine.time3,engine.time4])}
+    if isinstance(engine,GraphAlg):
+        g=engine.graph
+        d['engine']='GraphAlg'
+        d['graph_class']=type(g).__name__
+        for k,v in g.to_arrays().items():
+            d['graph_'+k]=v
+        s=engine.start
+        d['start']=g.vertices.index(s) if s is not None and s.halfedge is not None else -1
+        d['local']=engine.local
+        d['order_seed']=engine.order_seed
+        d['snapshot_every']=engine.snapshot_every
+        d['pertubation']=np.array([engine.pertubation1,engine.pertubation2])
+        d['rng']=json.dumps(engine.rng.bit_generator.state)
+        d['oracle_rows']=np.array(engine.oracle_rows,dtype=float).reshape(-1,engine.dim)
+        d['unfinished']=np.array((-1,-1) if engine.unfinished is None else engine.unfinished,dtype=np.int64)
+    else:
+        p=engine.pool
+        nodes=[]
+        facets=[]
+        for j,ids in engine.incident.items(): # order of the index is kept
+            nodes.extend(ids)
+            facets.extend([j]*len(ids))
+        d['engine']='ApproxDDM'
+        d['vec']=p.vec[0:p.size]
+        d['id']=p.id[0:p.size]
+        d['id_cnt']=p.id_cnt
+        d['inc_node']=np.array(nodes,dtype=np.int64)
+        d['inc_facet']=np.array(facets,dtype=np.int64)
+        d['facets']=np.array([f.index for f in engine.all_facets],dtype=np.int64)
+    tmp=filename+'.tmp'
+    with open(tmp,'wb') as f:
+        if compress:
+            np.savez_compressed(f,**d)
+        else:
+            np.savez(f,**d)
+    os.replace(tmp,filename)
+
+
+def load(filename,oracle=None):
+    """
+    returns the engine restored from the checkpoint filename, oracle:
+    separation oracle of the problem (oracle mode of GraphAlg)
+    """
+    with np.load(filename) as z:
+        d={k:z[k] for k in z.files}
+    problem=Problem(matrix=d['matrix'],eps=float(d['eps']),filename=str(d['filename']) or None)
+    problem.dim=problem.matrix.shape[1] # matrix is prepared already, no init()
+    problem.oracle=oracle
+    if str(d['engine'])=='GraphAlg':
+        a=GraphAlg(problem,GRAPH_CLASSES[str(d['graph_class'])])
+        a.graph=a.graph_class.from_arrays({k[6:]:v for k,v in d.items() if k.startswith('graph_') and k!='graph_class'})
+        start=int(d['start'])
+        a.start=None if start<0 else a.graph.vertices[start]
+        a.local=bool(d['local'])
+        a.order_seed=int(d['order_seed'])
+        a.snapshot_every=int(d['snapshot_every'])
+        a.pertubation1,a.pertubation2=d['pertubation'].tolist()
+        a.rng.bit_generator.state=json.loads(str(d['rng']))
+        a.oracle_rows=list(d['oracle_rows'])
+        unfinished=d['unfinished'].tolist()
+        a.unfinished=None if unfinished[0]<0 else tuple(unfinished)
+    else:
+        a=ApproxDDM(problem)
+        vec=d['vec']
+        ids=d['id']
+        n=vec.shape[0]
+        p=NodePool(3,max(n,64),(int(d['iter'])>>6)+1)
+        p.vec[0:n]=vec
+        p.id[0:n]=ids
+        p.row=np.full(max(int(d['id_cnt']),64),-1,dtype=np.int64)
+        p.row[ids]=np.arange(n)
+        p.size=n
+        p.id_cnt=int(d['id_cnt'])
+        incident={}
+        for i,j in zip(d['inc_node'].tolist(),d['inc_facet'].tolist()):
+            incident.setdefault(j,{})[i]=None
+        j=d['inc_facet']
+        np.bitwise_or.at(p.inc,(p.row[d['inc_node']],j>>6),np.uint64(1)<<(j & 63).astype(np.uint64))
+        a.pool=p
+        a.incident=incident
+        a.facets=[]
+        a.all_facets=[]
+        for j in d['facets'].tolist():
+            f=Facet()
+            f.index=j
+            f.hyperplane=problem.matrix[j]
+            a.facets.append(f)
+            a.all_facets.append(f)
+    a.iter=int(d['iter'])
+    a.block=int(d['block'])
+    a.block_end=int(d['block_end'])
+    a.active=d['active'] if d['active'].shape[0]>0 else None
+    a.order=str(d['order'])
+    a.skipped=d['skipped'].tolist()
+    a.peak_size,a.peak_iter=d['peak'].tolist()
+    a.time0,a.time1,a.time2,a.time3,a.time4=d['times'].tolist()
+    return a
@@ -3,7 +3,9 @@
 Implementation of the half-edge data structure
 
 """ 
+import numpy as np
 from sys import exit
+from sys import getsizeof
 from time import sleep
 from random import random,seed
 import matplotlib.pyplot as plt
@@ -12,14 +14,79 @@ from mpl_toolkits.mplot3d.art3d import Poly3DCollection
 H_TYPE={0:'00',1:'0-',2:'0+',3:'-0',4:'--',5:'-+',6:'+0',7:'+-',8:'++'}
 V_SIGN={0:'0',1:'-',2:'+'}
 
+
+class SlotList(list):
+    """
+    List of graph elements with removal in constant time
+        each element stores its position in the attribute slot,
+        remove() moves the last element to the position of the removed one
+    """
+    def append(self,x):
+        x.slot=len(self)
+        list.append(self,x)
+
+
+    def remove(self,x):
+        i=x.slot
+        if i is None or i>=len(self) or self[i] is not x:
+            raise ValueError('SlotList.remove(x): x not in list')
+        last=list.pop(self)
+        if last is not x:
+            self[i]=last
+            last.slot=i
+        x.slot=None
+
+
+
+
+class VertexList(SlotList):
+    """
+    SlotList of vertices which keeps the vectors of all vertices in one array
+        row i of coords is the vector of the vertex in slot i
+    """
+    def __init__(self,dim,capacity=64):
+        SlotList.__init__(self)
+        self.coords=np.zeros((capacity,dim))
+
+
+    def append(self,v):
+        n=len(self)
+        if n==self.coords.shape[0]:
+            coords=np.zeros((2*n,self.coords.shape[1]))
+            coords[0:n]=self.coords
+            self.coords=coords
+        vec=v.vector
+        SlotList.append(self,v)
+        v.owner=self
+        if vec is not None:
+            v.vector=vec
+
+
+    def remove(self,v):
+        vec=v.vector
+        i=v.slot
+        n=len(self)
+        SlotList.remove(self,v)
+        self.coords[i]=self.coords[n-1]
+        v.owner=None
+        v.vector=vec
+
+
+    def get_coords(self):
+        """
+        vectors of all vertices as (number of vertices x dim)-array (no copy)
+        """
+        return self.coords[0:len(self)]
+
+
+
+
 class HalfEdge:
     """
     Implements a half-edge
     """
-    halfedge_cnt=0
-    def __init__(self):
-        self.index  = HalfEdge.halfedge_cnt
-        HalfEdge.halfedge_cnt+=1
+    def __init__(self,index=0):
+        self.index  = index     # id assigned by the graph
         self.origin = None      #reference to the origin vertex
         self.face   = None      #reference to the incident face
         self.twin   = None      #reference to the twin halfedge
@@ -28,6 +95,7 @@ class HalfEdge:
         self.main   = None      #reference to main halfedge in edge (self or twin)
         self.type   = 0         # H-TYPE
         self.comment=''
+        self.slot=None          # position in the element list of the graph
         
         
     def __str__(self):
@@ -91,15 +159,15 @@ class Vertex:
     """
     Implements a vertex carrying a vector in R^3 and a sign        
     """
-    vertex_cnt=0
-    def __init__(self):
-        self.index=Vertex.vertex_cnt
-        Vertex.vertex_cnt+=1
+    def __init__(self,index=0):
+        self.index=index        # id assigned by the graph
         self.halfedge=None
-        self.vector=None
+        self.owner=None         # VertexList of the graph, holds the vector
+        self.__vector=None      # vector while not in a graph
         self.sign=0 # V_SIGN
         self.face_list=[]
         self.comment=''
+        self.slot=None          # position in the element list of the graph
         
         
     def __str__(self):
@@ -110,6 +178,24 @@ class Vertex:
         return 'v({0})'.format(self.index)
         
         
+    @property
+    def vector(self):
+        """
+        vector of the vertex (a copy of its row in the coordinates of the
+        VertexList when in a graph)
+        """
+        if self.owner is None:
+            return self.__vector
+        return self.owner.coords[self.slot].copy()
+        
+    @vector.setter
+    def vector(self,vec):
+        if self.owner is None:
+            self.__vector=vec
+        else:
+            self.owner.coords[self.slot]=vec
+        
+        
     def couple(self,he):
         self.halfedge=he
         he.origin=self
@@ -165,14 +251,13 @@ class Face:
     """
     Implements a face         
     """
-    face_cnt=0
-    def __init__(self):
-        self.index=Face.face_cnt
-        Face.face_cnt += 1
+    def __init__(self,index=0):
+        self.index=index        # id assigned by the graph
         self.halfedge=None
         self.component_index=0
         self.vertex_list=[]
         self.comment=''
+        self.slot=None          # position in the element list of the graph
         self.valid=True
         
         
@@ -263,10 +348,14 @@ class Graph:
     Implements a doubly-connected half-edge list         
     """
     def __init__(self,dim): # initialize as simplex
-        self.vertices=[]
-        self.faces=[]
-        self.edges=[]
+        self.vertices=VertexList(dim)
+        self.faces=SlotList()
+        self.edges=SlotList() # main halfedges only
         self.comp_he=[] # for storing one halfedge for each component
+        self.vertex_cnt=0 # ids of new elements, owned by the graph
+        self.face_cnt=0
+        self.halfedge_cnt=0
+        self.added=[0,0,0] # number of vertices, edges and faces added so far
         if dim==3:
             v0=self.__add_vertex()
             v1=self.__add_vertex()
@@ -350,10 +439,11 @@ class Graph:
         add edge to graph
             .prev and .next to be set manually
         """
-        he1=HalfEdge()
+        he1=self.__new_halfedge()
         he1.main=he1
         self.edges.append(he1) 
-        he2=HalfEdge()
+        self.added[1]+=1
+        he2=self.__new_halfedge()
         he2.main=he1
         he1.twin=he2
         he2.twin=he1
@@ -364,6 +454,15 @@ class Graph:
         return he1, he2
         
         
+    def __new_halfedge(self):
+        """
+        new halfedge with the next id of the graph
+        """
+        he=HalfEdge(self.halfedge_cnt)
+        self.halfedge_cnt+=1
+        return he
+        
+        
     def __merge_faces(self,f1,f2):
         he=f2.halfedge
         f1.halfedge=None # to be set manually
@@ -395,7 +494,9 @@ class Graph:
         """
         add vertex to graph
         """
-        v=Vertex()
+        v=Vertex(self.vertex_cnt)
+        self.vertex_cnt+=1
+        self.added[0]+=1
         self.vertices.append(v) 
         return v
         
@@ -417,7 +518,9 @@ class Graph:
         """
         add face to graph
         """ 
-        f=Face()
+        f=Face(self.face_cnt)
+        self.face_cnt+=1
+        self.added[2]+=1
         self.faces.append(f) 
         return f
  
@@ -564,6 +667,7 @@ class Graph:
         for vertex in self.vertices:
             vertex.index=ind
             ind+=1  
+        self.vertex_cnt=ind
         
  
     def export_to_off(self,filename='graph.off'):
@@ -685,20 +789,20 @@ class Graph:
         """
         Computes the components of a graph     
         """
-        faces=self.faces.copy()
+        self.comp_he=[]
+        for f in self.faces:
+            f.component_index=0
         i=0
-        while faces!=[]:
+        for f in self.faces:
+            if f.component_index!=0:
+                continue
             i+=1
-            f=faces.pop(0)
             self.comp_he.append(f.halfedge) # store one halfedge for each component
             f.component_index=i
             queue=[f]       
             while queue!=[]:
-                f=queue.pop(0)
-                flist=f.get_neighbors(test_index=0,set_index=i)
-                for f in flist:
-                    queue.append(f)
-                    faces.remove(f)
+                f=queue.pop()
+                queue.extend(f.get_neighbors(test_index=0,set_index=i))
                     
                     
     def number_of_components(self):
@@ -743,9 +847,257 @@ class Graph:
         for f in self.faces:
             if f.component_index==i:
                 j+=1
-        return j    
+        return j
+
+
+    def number_of_vertices(self):
+        return len(self.vertices)
+        
+        
+    def size(self):
+        """
+        numbers of vertices, edges and faces
+        """
+        return len(self.vertices),len(self.edges),len(self.faces)
         
         
+    def nbytes(self):
+        """
+        estimated memory of the elements in bytes: the objects with their 
+        attribute dicts and lists (measured on one element of each kind), 
+        the element lists and the coordinates
+        """
+        n=self.vertices.coords.nbytes
+        for l,k in ((self.vertices,1),(self.faces,1),(self.edges,2)): # 2 halfedges per edge
+            n+=getsizeof(l)
+            if len(l)>0:
+                x=l[0]
+                d=x.__dict__
+                n+=k*len(l)*(getsizeof(x)+getsizeof(d)+sum(getsizeof(y) for y in d.values() if type(y) is list))
+        return n
+
+
+    def get_coords(self):
+        """
+        vectors of all vertices (in the order of self.vertices) as array
+        """
+        return self.vertices.get_coords()
+
+
+    def coords_of(self,v):
+        """
+        vector of the vertex v as view of its row in the coordinates (no 
+        copy), valid until the graph is changed
+        """
+        return self.vertices.coords[v.slot]
+
+
+    def to_arrays(self):
+        """
+        returns the graph as dict of arrays, elements are numbered by their
+        position in vertices, faces and edges, the halfedges of edge k are 
+        2k (main halfedge) and 2k+1 (its twin), -1: None
+        """
+        def hid(h):
+            return -1 if h is None else 2*h.main.slot+(h.main is not h)
+        ne=len(self.edges)
+        he=np.empty((2*ne,4),dtype=np.int64) # origin, face, next, prev
+        he_type=np.empty(2*ne,dtype=np.int8)
+        for k,m in enumerate(self.edges):
+            for i,h in ((2*k,m),(2*k+1,m.twin)):
+                he[i]=(h.origin.slot,h.face.slot,hid(h.next),hid(h.prev))
+                he_type[i]=h.type
+        return {'coords':self.get_coords().copy(),
+                'v_sign':np.array([v.sign for v in self.vertices],dtype=np.int8),
+                'v_halfedge':np.array([hid(v.halfedge) for v in self.vertices],dtype=np.int64),
+                'he':he,
+                'he_type':he_type,
+                'f_halfedge':np.array([hid(f.halfedge) for f in self.faces],dtype=np.int64),
+                'f_valid':np.array([f.valid for f in self.faces],dtype=bool)}
+                
+                
+    @classmethod
+    def from_arrays(cls,arrays):
+        """
+        returns a new graph with the elements given by to_arrays()
+        """
+        g=cls.__new__(cls)
+        g.dim=arrays['coords'].shape[1]
+        g.vertices=VertexList(g.dim)
+        g.faces=SlotList()
+        g.edges=SlotList()
+        g.comp_he=[]
+        g.vertex_cnt=0
+        g.face_cnt=0
+        g.halfedge_cnt=0
+        g.added=[0,0,0]
+        V=[g.__add_vertex() for i in range(arrays['coords'].shape[0])]
+        F=[g.__add_face() for i in range(arrays['f_valid'].shape[0])]
+        H=[g.__new_halfedge() for i in range(arrays['he'].shape[0])]
+        g.vertices.coords[0:len(V)]=arrays['coords']
+        for k in range(0,len(H),2):
+            H[k].main=H[k]
+            H[k+1].main=H[k]
+            H[k].twin=H[k+1]
+            H[k+1].twin=H[k]
+            g.edges.append(H[k])
+            g.added[1]+=1
+        for h,(o,f,n,p),t in zip(H,arrays['he'].tolist(),arrays['he_type'].tolist()):
+            h.origin=V[o]
+            h.face=F[f]
+            h.next=H[n]
+            h.prev=H[p]
+            h.type=t
+        for v,h,s in zip(V,arrays['v_halfedge'].tolist(),arrays['v_sign'].tolist()):
+            v.halfedge=None if h<0 else H[h]
+            v.sign=s
+        for f,h,valid in zip(F,arrays['f_halfedge'].tolist(),arrays['f_valid'].tolist()):
+            f.halfedge=None if h<0 else H[h]
+            f.valid=valid
+        return g
+        
+        
+    def set_v_signs(self,signs):
+        """
+        sets the V_SIGN of each vertex, signs in the order of self.vertices
+        """
+        for v,s in zip(self.vertices,signs.tolist()):
+            v.sign=s
+
+
+    def set_h_types(self):
+        """
+        sets the H-TYPE of each halfedge from the signs of its vertices
+        """
+        for h in self.edges:
+            h.type=3*h.origin.sign + h.target().sign
+            h.twin.type=3*h.target().sign + h.origin.sign
+
+
+    def split_edges(self,point,hlist=None):
+        """
+        splits the -+ halfedges in hlist (default: all -+ halfedges) at 
+        point(u,w), u and w the vectors of origin and target, the new 
+        vertices get V_SIGN 0 and the halfedges the H-TYPES -0,0-,0+,+0,
+        returns the new vertices
+        """
+        if hlist is None:
+            hlist=[]
+            for h in self.edges[:]:
+                if h.type==5 or h.type==7:  #-+ or +-
+                    if h.type==7:
+                        h=h.twin # now h is -+               
+                    hlist.append(h)
+        vlist=[]
+        for h in hlist:
+            coords=self.vertices.coords # enlarged by split_edge()
+            vec=point(coords[h.origin.slot],coords[h.twin.origin.slot])
+            h1,h2=self.split_edge(h) # h as -+ expected
+            v=h2.origin
+            self.vertices.coords[v.slot]=vec
+            v.sign=0         # 0
+            h1.type=3        # -0
+            h1.twin.type=1   # 0-
+            h2.type=2        # 0+
+            h2.twin.type=6   # +0
+            vlist.append(v)
+        return vlist
+
+
+    def cut(self):
+        """
+        cut off "+"-part of graph and draw cycles along the cut, the -+ 
+        edges are split by split_edges()
+            "+"-part not necessarily connected
+        """
+        out_cuts=[]
+        
+        # store all +0 halfedges in queue
+        for he in self.edges: 
+            if he.type==6: # +0
+                if he.face.valid:
+                    out_cuts.append(he)
+            elif he.type==2: # 0+
+                if he.face.valid:
+                    out_cuts.append(he.twin)  
+
+        self.draw_cuts(out_cuts)
+        
+        # remove V_+       
+        for v in self.vertices[:]:
+            if v.sign==2: # +
+                while v.halfedge!=None:
+                    self.remove_edge(v.halfedge)
+                    
+        f2=self.get_faces_of_degree(2)
+        for f in f2:
+            self.remove_edge(f.halfedge)         
+
+
+    def draw_cuts(self,out_cuts):
+        """
+        insert edges around V_+, out_cuts contains the +0 halfedges 
+        """
+        
+        # Main idea
+        #   stopping points are
+        #       case 1: type 2 halfedges
+        #       case 2: followers of type 6 halfedges 
+        while out_cuts!=[]:
+            he=out_cuts[0]
+            ho=he.next # go to first stopping point (case 2)
+            finished=False
+            while True:                
+                hi=ho
+                while True: 
+                    if hi.type==2:
+                        self.split_face(hi,ho) # hi and ho are stopping points
+                        break
+                    hi=hi.next
+                # end while: hi is stopping point (case 1)
+                ho=hi.next
+                while True:
+                    if ho.type==6:
+                        out_cuts.remove(ho)
+                        if ho==he:
+                            finished=True
+                            break # optional
+                        ho=ho.next 
+                        self.split_face(ho,hi) # ho and hi are stopping points
+                        break
+                    else:
+                        ho=ho.next
+                # end while: ho is stopping point (case 2)
+       
+                if finished:
+                    break
+
+
+    def climb(self,v,hp):
+        """
+        hill climbing along the edges of the graph from the vertex v to a 
+        vertex maximizing hp @ vector, returns the vertex and its value
+        """
+        coords=self.vertices.coords
+        val=hp @ coords[v.slot]
+        while True:
+            best=None
+            he=v.halfedge
+            h=he
+            while h!=None: # halfedges with origin v
+                w=h.twin.origin
+                res=hp @ coords[w.slot]
+                if res>val:
+                    best=w
+                    val=res
+                h=h.twin.next
+                if h==he:
+                    break
+            if best==None:
+                return v,val
+            v=best
+
+
     def get_bridges(self):
         blist=[]
         for he in self.edges:
@@ -898,11 +1250,12 @@ class Graph:
         for v in self.vertices[:]:
             v.halfedge=None
             self.__remove_vertex(v)
-        Vertex.vertex_cnt=0
+        self.vertex_cnt=0
         for f in self.faces[:]:
             f.halfedge=None
             f.component_index=0
             self.__remove_face(f)
-        Face.face_cnt=0
+        self.face_cnt=0
         for h in self.edges[:]:
-            self.__kill_edge(h)
\ No newline at end of file
+            self.__kill_edge(h)
+        self.halfedge_cnt=0
\ No newline at end of file
@@ -6,9 +6,8 @@ Implementation of a Graph-based Approximate VE Algorithm
 import numpy as np 
 from sys import exit
 from time import process_time as clock
+from time import perf_counter
 from time import sleep
-from random import random
-from random import seed
 from inspect import currentframe, getframeinfo
 from Graph import HalfEdge
 from Graph import Vertex
@@ -17,18 +16,44 @@ from Graph import Graph
 from Graph import H_TYPE
 from Graph import V_SIGN
 from Problem import Problem
+from Problem import RowStream
+from Problem import read_rows
+from Order import reorder
+from Order import most_violated
+from Budget import Budget
 
 
 class GraphAlg: 
     
-    def __init__(self, problem):
+    def __init__(self, problem, graph_class=Graph, seed=0):
         self.problem=problem
+        self.graph_class=graph_class # Graph or ArrayGraph
         self.graph  = None
         self.matrix=problem.matrix
         self.dim=problem.dim
         self.eps=problem.eps
         self.pertubation1=0
         self.pertubation2=0
+        self.rng=np.random.default_rng(seed) # random numbers for the pertubations
+        self.local=False # output-sensitive steps, see __local_step()
+        self.start=None  # start vertex for the hill climbing in __local_step()
+        self.block=0     # number of upcoming rows evaluated at once, 0: off
+        self.block_end=0 # block evaluated for the rows block_end-len(active),...,block_end-1
+        self.active=None # active[i]: row block_end-len(active)+i cuts the graph
+        self.skipped=[]  # rows skipped since they did not cut the graph
+        self.skipped_rows=[] # (row, matrix[row]) of skipped rows of a RowStream for the recheck of run()
+        self.order='file'
+        self.order_seed=0 # seed of the order 'random', see set_order()
+        self.peak_size=0 # maximal number of vertices after a step 
+        self.peak_iter=0 # row after which peak_size was reached
+        self.oracle=problem.oracle # separation oracle, see Oracle.py
+        self.oracle_rows=[] # rows returned by the oracle and processed, numbered 
+                            # matrix.shape[0],... after the rows of matrix
+        self.snapshot_every=0 # rows between two snapshots of the graph for resolve(), 0: off
+        self.snapshots=[]     # (iter, graph.to_arrays(), len(skipped)) after the rows 0,...,iter-1
+        self.recorder=None # Recorder for per-row statistics, see Recorder.py, None: off
+        self.stopped=None    # reason why the last run() stopped early, see Budget.py, None: finished
+        self.unfinished=None # (first row, number of skipped rows) of a run stopped early
         self.__init_graph()
         self.iter = 0
         
@@ -48,62 +73,44 @@ class GraphAlg:
         """
         initialize as simplex
         """
-        self.graph=Graph(self.dim)
+        self.graph=self.graph_class(self.dim)
         A=self.matrix[0:self.dim+1]
         for i in range(self.dim+1):           
              self.graph.vertices[i].vector=np.linalg.solve(np.delete(A,i,0),(1+self.eps/2)*np.ones(self.dim))
         self.iter=self.dim+1
         
         
-    def __set_v_signs(self):
-        hp=self.matrix[self.iter]
-        for v in self.graph.vertices:
-            #res=hp @ v.vector #-> a bit faster:
-            if self.dim==3:
-                res0=hp[0]*v.vector[0]
-                res1=hp[1]*v.vector[1]
-                res2=hp[2]*v.vector[2]
-                res=res0+res1+res2
-            else:
-                res0=hp[0]*v.vector[0]
-                res1=hp[1]*v.vector[1]
-                res=res0+res1           
-            
-            #if (res < 1):
-            if (res < 1 + self.pertubation1*self.eps*(1/2-random())): # +- k1*eps/2
-                v.sign=1 #'-'
-            #elif (res > 1+self.eps):
-            elif (res > 1+self.eps + self.pertubation1*self.eps*(1/2-random())): # +- k1*eps/2
-                v.sign=2 #'+'
-            else:
-                v.sign=0 #'0'
+    def __set_v_signs(self,hp):
+        res=self.graph.get_coords() @ hp
+        lower=1
+        upper=1+self.eps
+        if self.pertubation1!=0:
+            noise=self.pertubation1*self.eps*(1/2-self.rng.random((2,res.shape[0]))) # +- k1*eps/2
+            lower=lower+noise[0]
+            upper=upper+noise[1]
+        signs=np.where(res<lower,1,np.where(res>upper,2,0)) # '-', '+', '0'
+        self.graph.set_v_signs(signs)
     
                 
-    def __set_h_types(self):           
-        for h in self.graph.edges:
-            h.type=3*h.origin.sign + h.target().sign
-            h.twin.type=3*h.target().sign + h.origin.sign
+    def __set_h_types(self):
+        self.graph.set_h_types()
     
     
-    def __add_verts(self):
-        for h in self.graph.edges[:]:
-            if h.type==5 or h.type==7:  #-+ or +-
-                if h.type==7:
-                    h=h.twin # now h is -+               
-                u_vec=h.origin.vector
-                w_vec=h.target().vector
-                hp=self.matrix[self.iter] 
-                hw=hp @ w_vec 
-                hd=hp @ (u_vec-w_vec)                      
-                #vec = ((1 + self.eps/2 - hw)/ hd) * (u_vec-w_vec) + w_vec
-                vec = ((1 + self.eps/2 + self.pertubation2*self.eps*(1/2-random()) - hw)/ hd) * (u_vec-w_vec) + w_vec # +- k2*eps/2
-                h1,h2=self.graph.split_edge(h) # h as -+ expected
-                h2.origin.vector=vec
-                h2.origin.sign=0 # 0
-                h1.type=3        # -0
-                h1.twin.type=1   # 0-
-                h2.type=2        # 0+
-                h2.twin.type=6   # +0
+    def __add_verts(self,hp):
+        return self.graph.split_edges(self.__split_point(hp))
+        
+        
+    def __split_point(self,hp):
+        """
+        returns point(u,w) for split_edges(): the point where the -+ edge 
+        uw is split at the hyperplane hp
+        """
+        def point(u_vec,w_vec):
+            hw=hp @ w_vec 
+            hd=hp @ (u_vec-w_vec)                      
+            #return ((1 + self.eps/2 - hw)/ hd) * (u_vec-w_vec) + w_vec
+            return ((1 + self.eps/2 + self.pertubation2*self.eps*(1/2-self.rng.random()) - hw)/ hd) * (u_vec-w_vec) + w_vec # +- k2*eps/2
+        return point
                 
 
     def __cut(self):
@@ -111,101 +118,492 @@ class GraphAlg:
         cut off "+"-part of graph and draw cycles along the cut
             "+"-part not necessarily connected
         """
-        out_cuts=[]
-        
-        # store all +0 halfedges in queue
-        for he in self.graph.edges: 
-            if he.type==6: # +0
-                if he.face.valid:
-                    out_cuts.append(he)
-            elif he.type==2: # 0+
-                if he.face.valid:
-                    out_cuts.append(he.twin)  
+        self.graph.cut()
 
-                
-        # insert edges around V_+ 
-        
-        # Main idea
-        #   stopping points are
-        #       case 1: type 2 halfedges
-        #       case 2: followers of type 6 halfedges 
-        while out_cuts!=[]:
-            he=out_cuts[0]
-            ho=he.next # go to first stopping point (case 2)
-            finished=False
-            while True:                
-                hi=ho
-                while True: 
-                    if hi.type==2:
-                        self.graph.split_face(hi,ho) # hi and ho are stopping points
-                        break
-                    hi=hi.next
-                # end while: hi is stopping point (case 1)
-                ho=hi.next
-                while True:
-                    if ho.type==6:
-                        out_cuts.remove(ho)
-                        if ho==he:
-                            finished=True
-                            break # optional
-                        ho=ho.next 
-                        self.graph.split_face(ho,hi) # ho and hi are stopping points
-                        break
-                    else:
-                        ho=ho.next
-                # end while: ho is stopping point (case 2)
-       
-                if finished:
+
+    def __outgoing(self,v):
+        """
+        halfedges with origin v
+        """
+        hlist=[]
+        he=v.halfedge
+        if he!=None:
+            h=he
+            while True:
+                hlist.append(h)
+                h=h.twin.next
+                if h==he:
                     break
-                    
-                    
-        #a=len(self.graph.get_faces_of_degree(2))          
-        
-        
-        # remove V_+       
-        for v in self.graph.vertices[:]:
-            if v.sign==2: # +
-                while v.halfedge!=None:
-                    self.graph.remove_edge(v.halfedge)
-                    
-        f2=self.graph.get_faces_of_degree(2)
+        return hlist
+        
+        
+    def __sign(self,res):
+        """
+        V_SIGN of a single vertex with res = hp @ vector
+        """
+        lower=1
+        upper=1+self.eps
+        if self.pertubation1!=0:
+            lower+=self.pertubation1*self.eps*(1/2-self.rng.random()) # +- k1*eps/2
+            upper+=self.pertubation1*self.eps*(1/2-self.rng.random()) # +- k1*eps/2
+        if res<lower:
+            return 1 #'-'
+        elif res>upper:
+            return 2 #'+'
+        else:
+            return 0 #'0'
+            
+            
+    def __climb(self,hp):
+        """
+        hill climbing along the edges of the graph to a vertex maximizing hp
+        """
+        v=self.start
+        if v==None or v.halfedge==None: # start vertex has been removed
+            v=self.graph.vertices[0]
+        return self.graph.climb(v,hp)
+            
+            
+    def __local_step(self,hp):
+        """
+        output-sensitive variant of set_v_signs(), set_h_types(), add_verts() 
+        and cut(): only the "+"-part of the graph and its neighbors are visited
+            the "+"-part is found by hill climbing and explored along the edges,
+            signs and H-TYPES of the other vertices and halfedges are not 
+            updated (and not needed)
+        """
+        t=clock()
+        v,val=self.__climb(hp)
+        if self.__sign(val)!=2:
+            self.time1+=clock()-t
+            return
+        signs={v:2}
+        plus=[v]
+        i=0
+        while i<len(plus):
+            for h in self.__outgoing(plus[i]):
+                w=h.target()
+                if w not in signs:
+                    s=self.__sign(hp @ self.graph.coords_of(w))
+                    signs[w]=s
+                    if s==2:
+                        plus.append(w)
+            i+=1
+        for w,s in signs.items():
+            w.sign=s
+        self.time1+=clock()-t
+        
+        t=clock()
+        hlist=[]
+        for w in plus:
+            for h in self.__outgoing(w):
+                s=h.target().sign
+                h.type=6+s       # +s
+                h.twin.type=3*s+2 # s+
+                if s==1:
+                    hlist.append(h.twin) # -+
+        self.time2+=clock()-t
+        
+        t=clock()
+        vlist=self.graph.split_edges(self.__split_point(hp),hlist)
+        self.time3+=clock()-t
+        
+        t=clock()
+        out_cuts=[]
+        for w in plus:
+            for h in self.__outgoing(w):
+                if h.type==6: # +0
+                    if h.main==h and h.face.valid:
+                        out_cuts.append(h)
+                    elif h.main!=h and h.twin.face.valid:
+                        out_cuts.append(h)
+        self.graph.draw_cuts(out_cuts)
+        
+        # remove V_+
+        for w in plus:
+            while w.halfedge!=None:
+                self.graph.remove_edge(w.halfedge)
+        
+        # remove faces of degree 2 along the cut
+        vlist.extend([w for w,s in signs.items() if s==0])
+        f2=set()
+        for w in vlist:
+            for h in self.__outgoing(w):
+                f2.add(h.face)
         for f in f2:
-            self.graph.remove_edge(f.halfedge)         
-
+            he=f.halfedge
+            if he!=None and he.next.next==he:
+                self.graph.remove_edge(he)
+        for w in vlist:
+            if w.halfedge!=None:
+                self.start=w
+                break
+        self.time4+=clock()-t
+        
+        
+    def __process(self,hp,row):
+        """
+        cut the graph with the hyperplane hp (matrix row row), recorded if 
+        a recorder is set
+        """
+        if self.recorder is None:
+            self.__apply(hp)
+            return
+        g=self.graph
+        w,c=perf_counter(),clock()
+        t=(self.time1,self.time2,self.time3,self.time4)
+        a0,s0=list(g.added),g.size()
+        self.__apply(hp)
+        c,w=clock()-c,perf_counter()-w
+        a1,s1=g.added,g.size()
+        add=[a1[k]-a0[k] for k in range(3)]
+        rem=[add[k]-s1[k]+s0[k] for k in range(3)]
+        self.recorder.append({'row':int(row),'wall':w,'cpu':c,
+            'signs':self.time1-t[0],'types':self.time2-t[1],'verts':self.time3-t[2],'cut':self.time4-t[3],
+            'v_add':add[0],'v_del':rem[0],'e_add':add[1],'e_del':rem[1],'f_add':add[2],'f_del':rem[2],
+            'vertices':s1[0],'edges':s1[1],'faces':s1[2]},g.nbytes)
+        
+        
+    def __apply(self,hp):
+        """
+        cut the graph with the hyperplane hp
+        """
+        if self.local:
+            self.__local_step(hp)
+            return
+            
+        t=clock()            
+        self.__set_v_signs(hp)            
+        self.time1+=clock()-t
+        
+        t=clock()            
+        self.__set_h_types()            
+        self.time2+=clock()-t
+        
+        t=clock()            
+        self.__add_verts(hp)            
+        self.time3+=clock()-t
+        
+        t=clock()            
+        self.__cut()            
+        self.time4+=clock()-t
+        
+        
+    def __recheck(self,index=None,size=2**20,local=False,rows=None):
+        """
+        processes the rows matrix[index] (default: all rows) again if they 
+        are violated by a vertex, with local steps if local is set, rows:
+        the rows matrix[index] if given (RowStream does not keep them)
+            the rows are evaluated in blocks of at most size entries 
+            (vertices x rows)
+            in local mode a "+"-vertex could have been missed by the hill climbing,
+            in block mode a row could have been skipped due to the pertubation
+        """
+        if index is None:
+            index=np.arange(self.matrix.shape[0])
+        tol=1+self.eps+self.pertubation1*self.eps/2
+        mode=self.local
+        self.local=local
+        i=0
+        while i<len(index):
+            V=self.graph.get_coords()
+            chunk=max(1,size//V.shape[0])
+            A=self.matrix[index[i:i+chunk]] if rows is None else rows[i:i+chunk]
+            res=V @ A.T
+            for j in np.flatnonzero(res.max(axis=0)>tol):
+                self.__process(A[j],index[i+j])
+                self.__update_peak(index[i+j])
+            i+=chunk
+        self.local=mode
+        
+        
+    def __cuts(self):
+        """
+        block mode: decides whether the row matrix[iter] has "+"-vertices,
+        the next block of rows is evaluated at once if necessary
+            a row without "+"-vertices does not cut the graph later on, since 
+            the convex hull of the vertices only shrinks 
+        """
+        if self.iter>=self.block_end:
+            rows=self.matrix[self.iter:self.iter+self.block]
+            res=self.graph.get_coords() @ rows.T
+            self.active=res.max(axis=0)>1+self.eps
+            self.block_end=self.iter+rows.shape[0]
+        return self.active[self.iter-self.block_end+len(self.active)]
                 
+                
+    def __farthest_first(self):
+        """
+        order 'farthest': moves the row most violated by the vertices to 
+        position iter, returns whether it cuts the graph
+            rows of the initial simplex stay in front and are processed as 
+            in the other orders
+        """
+        if self.iter<=self.dim:
+            return True
+        i,res=most_violated(self.matrix,self.iter,self.graph.get_coords())
+        self.matrix[[self.iter,i]]=self.matrix[[i,self.iter]]
+        return res>1+self.eps
+        
+        
+    def set_order(self,order='file',seed=0):
+        """
+        sets the order of the rows not processed yet, see Order.py
+        """
+        first=max(self.iter,self.dim+1) # rows of the initial simplex stay in front
+        self.matrix=reorder(self.matrix,first,order,seed)
+        if order=='farthest':
+            self.matrix=self.matrix.copy() # rows are swapped in each step
+        self.order=order
+        self.order_seed=seed
+        self.block_end=self.iter # evaluated block is invalid
+        
+        
     def step(self):
         if self.iter < self.matrix.shape[0]:
-            t=clock()            
-            self.__set_v_signs()            
-            self.time1+=clock()-t
+            if self.order=='farthest':
+                if not self.__farthest_first(): # no row cuts the graph anymore
+                    self.skipped.extend(range(self.iter,self.matrix.shape[0]))
+                    self.iter=self.matrix.shape[0]
+                    return
+                self.__process(self.matrix[self.iter],self.iter)
+            elif self.block>0 and not self.__cuts():
+                self.skipped.append(self.iter)
+                if self.pertubation1>0 and isinstance(self.matrix,RowStream):
+                    self.skipped_rows.append((self.iter,self.matrix[self.iter]))
+            else:
+                self.__process(self.matrix[self.iter],self.iter)
+            self.__update_peak(self.iter)
+            self.iter+=1
+            if self.snapshot_every>0 and self.iter%self.snapshot_every==0:
+                self.snapshots.append((self.iter,self.graph.to_arrays(),len(self.skipped)))
+        else:
+            print('ApproxVE.step(): no further step to do.')
             
-            t=clock()            
-            self.__set_h_types()            
-            self.time2+=clock()-t
             
-            t=clock()            
-            self.__add_verts()            
-            self.time3+=clock()-t
+    def __update_peak(self,row):
+        n=self.graph.number_of_vertices()
+        if n>self.peak_size:
+            self.peak_size=n
+            self.peak_iter=row
             
-            t=clock()            
-            self.__cut()            
-            self.time4+=clock()-t
             
-            self.iter+=1
-        else:
-            print('ApproxVE.step(): no further step to do.')
+    def __query_oracle(self,budget):
+        """
+        oracle mode: processes the rows returned by the oracle for the current 
+        vertices until the oracle returns None or a row that no vertex violates
+        by more than eps, returns the reason if the budget stops it
+        """
+        tol=1+self.eps+self.pertubation1*self.eps/2
+        while True:
+            row=self.oracle(self.graph.get_coords())
+            if row is None:
+                return None
+            row=np.asarray(row,dtype=float)
+            if (self.graph.get_coords() @ row).max()<=tol:
+                return None
+            stopped=budget.check(self)
+            if stopped is not None:
+                return stopped
+            n=self.matrix.shape[0]+len(self.oracle_rows)
+            self.__process(row,n)
+            if self.local and (self.graph.get_coords() @ row).max()>tol:
+                # hill climbing missed "+"-vertices, see __recheck()
+                self.local=False
+                self.__process(row,n)
+                self.local=True
+            self.oracle_rows.append(row)
+            self.__update_peak(n)
             
             
-    def run(self):
+    def run(self,time_limit=None,max_rows=None,callback=None,cancel=None):
+        """
+        processes the remaining rows, returns True if finished and False if 
+        stopped early by the limits (see Budget.py), the reason is stored in
+        self.stopped and the run is continued by calling run() again
+            the limits are checked before each row and oracle row, the 
+            rechecks of local and block mode are done without a check
+        """
+        if self.local and isinstance(self.matrix,RowStream):
+            print('GraphAlg: local mode rechecks all rows, which a row stream does not keep')
+            exit(1)
         t=clock()
+        budget=Budget(time_limit,max_rows,callback,cancel)
+        if self.unfinished is None:
+            self.unfinished=(self.iter,len(self.skipped))
+        first,nskip=self.unfinished
         while self.iter < self.matrix.shape[0]:
             #print('GraphAlg: Processing inequality {}'.format(self.iter))
+            self.stopped=budget.check(self)
+            if self.stopped is not None:
+                self.time0+=clock()-t
+                return False
             self.step()
-        self.time0=clock()-t 
+        if self.local:
+            self.__recheck(np.arange(first,self.matrix.shape[0]))
+        elif len(self.skipped)>nskip and self.pertubation1>0: # without pertubation skipped rows do not cut
+            if isinstance(self.matrix,RowStream):
+                self.__recheck(np.array([i for i,r in self.skipped_rows],dtype=int),
+                               rows=np.array([r for i,r in self.skipped_rows]).reshape(-1,self.dim))
+            else:
+                self.__recheck(np.array(self.skipped[nskip:]))
+        self.skipped_rows=[]
+        self.unfinished=(self.matrix.shape[0],len(self.skipped)) # rechecks done
+        if self.oracle is not None:
+            self.stopped=self.__query_oracle(budget)
+            if self.stopped is not None:
+                self.time0+=clock()-t
+                return False
+        self.unfinished=None
+        self.stopped=None
+        self.time0+=clock()-t 
         
         #self.graph.remove_bridges()
         
         self.graph.find_components()
+        return True
+        
+    def refine(self,eps):
+        """
+        continues from the current graph with a tolerance eps <= self.eps,
+        only the rows violated by more than eps are processed again
+            the graph for the larger tolerance is an outer approximation of 
+            the polytope, cutting it further yields an approximation for eps
+        """
+        if eps>self.eps:
+            print('GraphAlg.refine(): eps must not increase')
+            exit(1)
+        t=clock()
+        self.eps=eps
+        self.__recheck(np.arange(self.iter),local=self.local)
+        if self.local:
+            self.__recheck(np.arange(self.iter))
+        self.time0+=clock()-t
+        self.run() # remaining rows, oracle and components
+        
+        
+    def coarse_to_fine(self,levels):
+        """
+        generator of anytime results: solves for the largest tolerance of 
+        levels, then refines the graph to the smaller ones, see refine(),
+        yields each tolerance as soon as the graph approximates the polytope
+        with this tolerance
+        """
+        levels=sorted(levels,reverse=True)
+        if self.iter>self.dim+1:
+            self.refine(levels[0])
+        else:
+            self.eps=levels[0]
+            self.run()
+        yield levels[0]
+        for eps in levels[1:]:
+            self.refine(eps)
+            yield eps
+            
+            
+    def add_inequalities(self,rows):
+        """
+        appends rows (inequalities row x <= 1) to the matrix and processes 
+        them, continuing from the current graph
+        """
+        if isinstance(self.matrix,RowStream):
+            print('GraphAlg: inequalities cannot be added to a row stream')
+            exit(1)
+        rows=np.atleast_2d(np.asarray(rows,dtype=float))
+        if rows.shape[1]!=self.dim:
+            print('GraphAlg: rows with {} columns expected'.format(self.dim))
+            exit(1)
+        self.matrix=np.vstack((self.matrix,rows))
+        self.run()
+        
+        
+    def step_many(self,rows,chunk=65536):
+        """
+        adds the inequalities of an iterable of rows (or arrays of rows), 
+        read and processed in chunks of at least chunk rows
+        """
+        source=iter(rows)
+        while True:
+            A=read_rows(source,chunk)
+            if A is None:
+                break
+            self.add_inequalities(A)
+            
+            
+    def resolve(self,rows,max_replay=0.5):
+        """
+        solves the problem again for rows (without bounding simplex, as in 
+        the csv file) which differ from the current matrix in a few rows
+            rows not in the matrix are processed by add_inequalities(),
+            if rows of the matrix were removed, the graph is restored from the
+            last snapshot before the first removed row and the remaining rows 
+            are processed again from there,
+            a full run is done if a row of the bounding simplex was removed, 
+            the bounding simplex of the rows differs from the current one (its
+            closing row depends on all rows, a stale simplex may cut off parts
+            of the new polytope) or more than max_replay of the rows would be 
+            processed again
+        """
+        rows=np.atleast_2d(np.asarray(rows,dtype=float))
+        count={}
+        for r in map(tuple,rows.tolist()):
+            count[r]=count.get(r,0)+1
+        removed=[]
+        for i,r in enumerate(map(tuple,self.matrix[0:self.iter].tolist())):
+            if count.get(r,0)>0:
+                count[r]-=1
+            elif i!=self.dim: # row dim of the simplex is not a row of the problem
+                removed.append(i)
+        added=[r for r,c in count.items() for j in range(c)]
+        if removed==[]:
+            if added!=[]:
+                self.add_inequalities(added)
+            return
+        problem=Problem(matrix=rows,eps=self.eps,filename=self.problem.filename)
+        problem.oracle=self.problem.oracle
+        snaps=[s for s in self.snapshots if s[0]<=removed[0]]
+        if removed[0]<self.dim or snaps==[] or rows.shape[0]-snaps[-1][0]>max_replay*rows.shape[0]:
+            self.__full_resolve(problem)
+            return
+        problem.init()
+        if not np.array_equal(problem.matrix[0:self.dim+1],self.matrix[0:self.dim+1]):
+            self.__full_resolve(problem)
+            return
+        it,arrays,nskip=snaps[-1]
+        keep=np.ones(self.matrix.shape[0],dtype=bool)
+        keep[removed]=False
+        A=self.matrix[keep]
+        if added!=[]:
+            A=np.vstack((A,added))
+        self.graph=self.graph_class.from_arrays(arrays)
+        self.matrix=A
+        self.iter=it
+        self.skipped=self.skipped[0:nskip]
+        self.snapshots=snaps
+        self.start=None
+        self.block_end=it
+        self.oracle_rows=[]
+        self.unfinished=None
+        self.run()
+        
+        
+    def __full_resolve(self,problem):
+        """
+        new run for the problem (initialized or not) with the settings of 
+        this instance
+        """
+        settings=('local','block','pertubation1','pertubation2','snapshot_every','recorder','rng','time0','time1','time2','time3','time4')
+        order,seed=self.order,self.order_seed
+        old={k:getattr(self,k) for k in settings}
+        if problem.dim==0:
+            problem.init()
+        self.__init__(problem,self.graph_class)
+        for k,v in old.items():
+            setattr(self,k,v)
+        if order!='file':
+            self.set_order(order,seed)
+        self.run()
+        
         
     def list_faces(self):
         self.graph.list_faces() 
@@ -226,6 +624,13 @@ class GraphAlg:
         print('  ----------------')
         print('  total          : {}'.format(round(self.time0,3)))
         print('--------------------------------------------------')
+        if self.block>0 or self.order=='farthest':
+            print('Skipped rows      : {0} of {1}'.format(len(self.skipped),self.matrix.shape[0]))
+        print('Order of rows     : {}'.format(self.order))
+        if self.oracle is not None:
+            print('Oracle rows       : {}'.format(len(self.oracle_rows)))
+        print('Peak size         : {0} vertices after row {1}'.format(self.peak_size,self.peak_iter))
+        print('--------------------------------------------------')
         print('Polytope information .....')
         print('  Vertices          : {}'.format(len(self.graph.vertices)))
         print('  Edges             : {}'.format(len(self.graph.edges)))
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+Memory profiling of GraphAlg and ApproxDDM
+
+    memory mode: an engine with recorder=Recorder(memory=True) records the
+    memory of its data structures after each row (see Recorder.py)
+
+    profile()      : runs an engine in memory mode and reports the peak
+    estimate_peak(): dry run, predicts the peak memory of a run from its
+                     first k rows
+
+"""
+import numpy as np
+import tracemalloc
+from sys import exit
+from Graph import Graph
+from GraphAlg import GraphAlg
+from ApproxDDM import ApproxDDM
+from Recorder import Recorder
+
+
+def profile(engine,trace=False):
+    """
+    runs the engine (GraphAlg or ApproxDDM) in memory mode, returns a dict
+    with the keys
+        peak_bytes  : peak memory of the data structures (own accounting)
+        peak_row    : row after which peak_bytes was reached
+        peak_traced : peak memory allocated by Python during the run, 
+                      including temporary arrays and the records (None 
+                      without trace), tracemalloc is started if trace is 
+                      set, which slows down the run considerably
+        matrix      : bytes of the matrix
+    the records are kept in engine.recorder
+    """
+    if engine.recorder is None:
+        engine.recorder=Recorder(memory=True)
+    elif not engine.recorder.memory:
+        print('profile(): the recorder of the engine is not in memory mode')
+        exit(1)
+    started=trace and not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+        base=tracemalloc.get_traced_memory()[0]
+    try:
+        engine.run()
+        traced=tracemalloc.get_traced_memory()[1]-base if tracemalloc.is_tracing() else None
+    finally:
+        if started:
+            tracemalloc.stop()
+    b,row=engine.recorder.peak('bytes')
+    return {'peak_bytes':b,'peak_row':row,'peak_traced':traced,
+            'matrix':engine.matrix.nbytes}
+
+
+def estimate_peak(problem,k=1000,engine='GraphAlg',local=False,graph_class=Graph):
+    """
+    predicts the peak memory of a run of engine ('GraphAlg' or 'ApproxDDM')
+    on the initialized problem from its first k rows, returns a dict with
+    the keys
+        peak_bytes  : predicted peak memory of the data structures and matrix
+        peak_size   : predicted peak number of vertices (nodes)
+        exponent    : exponent p of the growth size ~ row^p, fitted on the
+                      second half of the k rows (not below 0)
+        per_element : bytes per vertex (node), fitted on the k rows
+        observed    : peak memory of the data structures in the k rows
+        rows        : number of rows processed
+        reliable    : False if peak_bytes may be too low
+    the size is extrapolated to the last row, this overestimates the peak
+    if the growth slows down later, which is typical for GraphAlg, the 
+    estimate is reliable for GraphAlg with exponent<=1; ApproxDDM can blow 
+    up late (e.g. 18 times the estimate of the first 200 rows on P_5 with
+    eps=1e-3), its estimate is only reliable if the run is finished within 
+    the k rows
+    """
+    if engine=='GraphAlg':
+        a=GraphAlg(problem,graph_class)
+        a.local=local
+        col='vertices'
+    elif engine=='ApproxDDM':
+        a=ApproxDDM(problem)
+        col='nodes'
+    else:
+        print("engine must be 'GraphAlg' or 'ApproxDDM'")
+        exit(1)
+    a.recorder=Recorder(memory=True)
+    m=a.matrix.shape[0]
+    while a.iter<m and len(a.recorder)<k:
+        a.step()
+    A=a.recorder.arrays()
+    if len(a.recorder)<2:
+        print('estimate_peak(): too few rows processed')
+        exit(1)
+    row=A['row']+1.0 # rows processed
+    size=A[col].astype(float)
+    bytes=A['bytes'].astype(float)
+    if size.max()>size.min():
+        per_element,base=np.polyfit(size,bytes,1)
+    else:
+        per_element,base=bytes.max()/size.max(),0.0
+    h=row>=(row[0]+row[-1])/2
+    if h.sum()>=2 and row[h].max()>row[h].min():
+        p=np.polyfit(np.log(row[h]),np.log(np.maximum(size[h],1)),1)[0]
+    else:
+        p=1.0
+    p=max(p,0.0)
+    finished=a.iter>=m
+    peak_size=max(size.max(),size[-1]*(m/row[-1])**p)
+    peak_bytes=max(bytes.max(),base+per_element*peak_size)
+    return {'peak_bytes':int(peak_bytes+a.matrix.nbytes),'peak_size':int(peak_size),
+            'exponent':p,'per_element':per_element,'observed':int(bytes.max()),
+            'rows':int(row[-1]),'reliable':finished or (engine=='GraphAlg' and p<=1.0)}
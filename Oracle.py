@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+Oracles for polytopes (or convex bodies) given implicitly, used in the oracle
+mode of GraphAlg (Problem.oracle)
+
+    separation oracle: function oracle(V) of the vertex coordinates V (one
+                       vertex per row) returning a row a with a x <= 1 for all
+                       x of the body, preferably maximizing max_v a v,
+                       or None if there is no such row violated by V
+    support function : function h(d) returning max { d x : x in body }
+
+    the body has to contain the origin in its interior
+
+"""
+import numpy as np
+from Order import most_violated
+
+
+def support_rows(support,dim):
+    """
+    returns the rows d/h(d) for d=+-e_1,...,+-e_dim, they describe a box
+    containing the body and can be used as matrix of the problem
+    """
+    D=np.vstack((np.eye(dim),-np.eye(dim)))
+    return np.array([d/support(d) for d in D])
+
+
+def ball_support(radius=1.0):
+    """
+    support function of the ball with center 0
+    """
+    return lambda d: radius*np.linalg.norm(d)
+
+
+def ball_oracle(radius=1.0):
+    """
+    separation oracle of the ball with center 0: tangent hyperplane at the
+    direction of the vertex of largest norm
+    """
+    def oracle(V):
+        norms=np.linalg.norm(V,axis=1)
+        i=np.argmax(norms)
+        return V[i]/(norms[i]*radius)
+    return oracle
+
+
+def matrix_oracle(matrix):
+    """
+    separation oracle of the polytope {x : matrix x <= 1}: most violated row
+    """
+    def oracle(V):
+        i,res=most_violated(matrix,0,V)
+        return matrix[i]
+    return oracle
+
+
+def intersection_oracle(*oracles):
+    """
+    separation oracle of the intersection of bodies given by oracles: the
+    returned row which is violated most
+    """
+    def oracle(V):
+        best=None
+        for o in oracles:
+            row=o(V)
+            if row is not None and (best is None or (V @ row).max()>(V @ best).max()):
+                best=row
+        return best
+    return oracle
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+Insertion orders for the inequalities of a problem
+
+    'file'     : rows as given
+    'random'   : seeded random shuffle
+    'farthest' : row most violated by the current vertices first, 
+                 chosen in each step of the algorithm (see most_violated)
+    'maxangle' : each row has maximal angle to the rows before
+
+"""
+import numpy as np
+from sys import exit
+
+ORDERS=['file','random','farthest','maxangle']
+
+
+def random_order(matrix,first,seed=0):
+    """
+    random permutation of the row indices first,...,m-1
+    """
+    m=matrix.shape[0]
+    return first+np.random.default_rng(seed).permutation(m-first)
+    
+    
+def maxangle_order(matrix,first):
+    """
+    permutation of the row indices first,...,m-1 such that each row has the 
+    maximal angle to the rows before (including the rows 0,...,first-1),
+    greedy, O(m^2)
+    """
+    m=matrix.shape[0]
+    U=matrix/np.linalg.norm(matrix,axis=1)[:,None]
+    cos=np.full(m-first,-np.inf) # max cosine to the rows chosen
+    if first>0:
+        cos=np.max(U[first:] @ U[0:first].T,axis=1)
+    perm=np.empty(m-first,dtype=int)
+    for k in range(m-first):
+        j=np.argmin(cos)
+        perm[k]=first+j
+        cos=np.maximum(cos,U[first:] @ U[first+j])
+        cos[j]=np.inf
+    return perm
+    
+    
+def most_violated(matrix,first,coords,chunk=1024):
+    """
+    index i>=first of the row maximizing max_v matrix[i] @ v over the rows of
+    coords, returns i and the maximum
+    """
+    best=-np.inf
+    ibest=first
+    for i in range(first,matrix.shape[0],chunk):
+        res=(coords @ matrix[i:i+chunk].T).max(axis=0)
+        j=np.argmax(res)
+        if res[j]>best:
+            best=res[j]
+            ibest=i+j
+    return ibest,best
+    
+    
+def reorder(matrix,first,order,seed=0):
+    """
+    returns the matrix with the rows first,...,m-1 in the given order,
+    the matrix is copied unless order is 'file'
+    """
+    if order not in ORDERS:
+        print('order must be one of {}'.format(ORDERS))
+        exit(1)
+    if order=='file':
+        return matrix
+    if not isinstance(matrix,np.ndarray):
+        print('order {} needs all rows, not available for a row stream'.format(order))
+        exit(1)
+    matrix=matrix.copy()
+    if order=='random':
+        matrix[first:]=matrix[random_order(matrix,first,seed)]
+    elif order=='maxangle':
+        matrix[first:]=matrix[maxangle_order(matrix,first)]
+    return matrix
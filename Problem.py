@@ -4,10 +4,110 @@ Class for Approximate Vertex Enumeration problem instances
 
 """
 
+import os
+import re
+from itertools import islice
 import numpy as np 
 from scipy.optimize import linprog
 
 
+def csv_chunks(filename,chunk=65536):
+    """
+    generator of the rows of a csv file as float arrays of at most chunk rows
+    """
+    with open(filename) as f:
+        while True:
+            lines=list(islice(f,chunk))
+            if lines==[]:
+                return
+            yield np.loadtxt(lines,delimiter=',',ndmin=2)
+            
+            
+def read_rows(source,k):
+    """
+    reads items (rows or arrays of rows) from the iterator source until at 
+    least k rows are read, returns them as array or None if source is exhausted
+    """
+    blocks=[]
+    cnt=0
+    for item in source:
+        item=np.atleast_2d(np.asarray(item,dtype=float))
+        blocks.append(item)
+        cnt+=item.shape[0]
+        if cnt>=k:
+            break
+    if cnt==0:
+        return None
+    return np.concatenate(blocks)
+    
+    
+class RowStream:
+    """
+    read-only matrix whose rows are consumed from an iterator when needed,
+    used as Problem.matrix for a row source
+        head: first rows (bounding simplex), kept in memory
+        the other rows are buffered in two chunks (current and next), a row 
+        is accessible as long as it belongs to the current or next chunk
+        shape[0] is the number of rows read so far, it is the number of all
+        rows once the source is exhausted
+    """
+    def __init__(self,head,rows,source,chunk=65536):
+        self.head=head
+        self.source=source
+        self.chunk=chunk
+        self.start=head.shape[0] # index of the first row of buffer
+        self.buffer=rows
+        self.next=read_rows(self.source,chunk)
+        
+        
+    @property
+    def shape(self):
+        m=self.start+self.buffer.shape[0]
+        if self.next is not None:
+            m+=self.next.shape[0]
+        return (m,self.head.shape[1])
+        
+        
+    def __advance(self,i):
+        """
+        reads chunks until row i is in buffer or the source is exhausted
+        """
+        while i>=self.start+self.buffer.shape[0] and self.next is not None:
+            self.start+=self.buffer.shape[0]
+            self.buffer=self.next
+            self.next=read_rows(self.source,self.chunk)
+            
+            
+    def __getitem__(self,key):
+        if isinstance(key,slice) and key.step is None:
+            i=key.start or 0
+            j=self.shape[0] if key.stop is None else key.stop
+            h=self.head.shape[0]
+            if j<=h:
+                return self.head[key]
+            if i<h and self.start==h: # first chunk still buffered
+                return np.concatenate((self.head[i:],self.buffer[0:j-h]))
+            self.__advance(i)
+            if i>=self.start:
+                return self.buffer[i-self.start:j-self.start]
+        elif np.ndim(key)==0:
+            i=int(key)
+            if i<self.head.shape[0]:
+                return self.head[i]
+            self.__advance(i)
+            if self.start<=i<self.start+self.buffer.shape[0]:
+                return self.buffer[i-self.start]
+        print('RowStream: rows {} not available, only consecutive rows are streamed'.format(key))
+        exit(1)
+        
+        
+    def __setitem__(self,key,value):
+        print('RowStream: rows of a stream cannot be changed')
+        exit(1)
+        
+        
+        
+        
 class Problem:
     """
     implements an algorithm for Approximate Vertex Enumeration         
@@ -17,6 +117,11 @@ class Problem:
         self.eps=eps
         self.dim=0
         self.filename=filename
+        self.cache=True # keep a binary .npy sidecar of the csv file
+        self.source=None  # iterable of rows or arrays of rows, e.g. csv_chunks(filename), 
+                          # streamed instead of loading matrix from filename
+        self.head=1024    # number of rows of source used for the bounding simplex
+        self.oracle=None  # separation oracle providing further rows (GraphAlg), see Oracle.py
         
     
     def __check_matrix(self):
@@ -58,7 +163,7 @@ class Problem:
         b=np.zeros((m+1,1))
         c=np.zeros((1,m+1))
         c[0,m]=-1
-        res=linprog(c,A_ub=B,b_ub=b,A_eq=A,b_eq=a,method='revised simplex')
+        res=linprog(c,A_ub=B,b_ub=b,A_eq=A,b_eq=a,method='highs')
         t=res.x[0:m]
         s=res.x[m]
         if s<1e-10:
@@ -75,109 +180,143 @@ class Problem:
         """
         obtain new row by solving the linear program 
         
-            max_x c^T   s.t.
+            min_x c^T x   s.t.
                A x <= e
         
-            where c is the sum of 3 linearly independent rows
-
+            where c is the sum of the first n (linearly independent) rows
+            
+        the LP is solved for the rows most anti-aligned with c first, the 
+        number of rows is doubled as long as the LP is unbounded
         """ 
         n=self.matrix.shape[1]
-        if n==3:
-            new_row = self.matrix[0]+self.matrix[1]+self.matrix[2]  
-        elif n==2:
-            new_row = self.matrix[0]+self.matrix[1]
-        else:
-            exit(1)             
-        m=len(self.matrix)
-        mm=min(m,20)       
-        res=linprog(c=new_row,A_ub=self.matrix[0:mm],b_ub=np.ones((mm,1)), bounds=(None,None), method='revised simplex')   
-        if res.fun == np.NINF:
-            print('Polytope is unbounded')
+        m=self.matrix.shape[0]
+        new_row=self.matrix[0:n].sum(axis=0)
+        norms=np.linalg.norm(self.matrix,axis=1)
+        cos=np.divide(self.matrix @ new_row,norms,out=np.zeros(m),where=norms>0)
+        rows=np.argsort(cos,kind='stable')
+        mm=min(m,20)
+        while True:
+            A=self.matrix[rows[0:mm]]
+            res=linprog(c=new_row,A_ub=A,b_ub=np.ones(mm),bounds=(None,None),method='highs',
+                        options={'primal_feasibility_tolerance':1e-9})
+            if res.status!=3: # not unbounded
+                break
+            if mm==m:
+                print('Polytope is unbounded')
+                exit(1)
+            mm=min(m,2*mm)
+        if res.status!=0:
+            print('Problem: linprog failed: {}'.format(res.message))
             exit(1)
         new_row=new_row / (res.fun-1) # "minus 1" usually not necessary
         return new_row
 
 
+    def __get_basis(self):
+        """
+        greedy orthogonalization (pivoted QR of the transposed matrix with 
+        the rows scaled to norm 1): returns the sorted indices of n linearly 
+        independent rows
+            in each step the row is chosen whose distance to the span of the
+            rows chosen so far is largest relative to its norm
+        """
+        n=self.matrix.shape[1]
+        norms=np.linalg.norm(self.matrix,axis=1)
+        R=self.matrix.copy() # residuals w.r.t. the span of the chosen rows
+        basis=[]
+        for l in range(n):
+            dist=np.divide(np.linalg.norm(R,axis=1),norms,out=np.zeros(len(norms)),where=norms>0)
+            dist[basis]=0
+            i=np.argmax(dist)
+            basis.append(int(i))
+            q=R[i]/np.linalg.norm(R[i])
+            R-=np.outer(R @ q,q)
+        return sorted(basis)
+        
+
     def __prepare_matrix(self):
         """
         matrix is changed: 
             order of rows changed
             one row added
-        first 4 rows of resulting matrix describe simplex containing polytope
+        first n+1 rows of resulting matrix describe simplex containing polytope
         exit(1) if polytope is unbounded       
         """
         m, n = self.__check_matrix() 
-        if n==3:
-            breaker=False
-            for i in range(m):
-                for j in range(i+1,m):
-                    if np.linalg.matrix_rank([self.matrix[i],self.matrix[j],self.matrix[j]])==2:
-                        for k in range(j+1,m):
-                            if np.linalg.matrix_rank([self.matrix[i],self.matrix[j],self.matrix[k]])==3:
-                                breaker=True
-                                break
-                    if breaker:
-                        break
-                if breaker:
-                    break
-            tmp0=self.matrix[i].copy() 
-            tmp1=self.matrix[j].copy()
-            tmp2=self.matrix[k].copy()
-            self.matrix[i]=self.matrix[0]   
-            self.matrix[j]=self.matrix[1]
-            self.matrix[k]=self.matrix[2]
-            self.matrix[0]=tmp0
-            self.matrix[1]=tmp1
-            self.matrix[2]=tmp2  
-            new_row=self.__get_new_row()
-            self.matrix=np.append(self.matrix,[new_row],axis=0)
-            # change new row with row 4
-            tmp=self.matrix[3].copy()
-            self.matrix[3]=self.matrix[m].copy()
-            self.matrix[m]=tmp.copy()
-        elif n==2:
-            breaker=False
-            for i in range(m):
-                for j in range(i+1,m):
-                    if np.linalg.matrix_rank([self.matrix[i],self.matrix[j],self.matrix[j]])==2:
-                        breaker=True
-                        break
-                if breaker:
-                    break
-            tmp0=self.matrix[i].copy() 
-            tmp1=self.matrix[j].copy()
-            self.matrix[i]=self.matrix[0]   
-            self.matrix[j]=self.matrix[1]
-            self.matrix[0]=tmp0
-            self.matrix[1]=tmp1 
-            new_row=self.__get_new_row()
-            self.matrix=np.append(self.matrix,[new_row],axis=0)
-            # change new row with row 3
-            tmp=self.matrix[2].copy()
-            self.matrix[2]=self.matrix[m].copy()
-            self.matrix[m]=tmp.copy()
-            
-        else:
+        if n!=3 and n!=2:
             print('matrix must have 2 or 3 columns')
             exit(1)
+        basis=self.__get_basis()
+        tmp=self.matrix[basis].copy()
+        for l,i in enumerate(basis):
+            self.matrix[i]=self.matrix[l]
+        self.matrix[0:n]=tmp
+        new_row=self.__get_new_row()
+        self.matrix=np.append(self.matrix,[new_row],axis=0)
+        # change new row with row n
+        tmp=self.matrix[n].copy()
+        self.matrix[n]=self.matrix[m].copy()
+        self.matrix[m]=tmp.copy()
         
         
     def __load_matrix(self):
-        import csv
-        with open(self.filename, newline='') as f:
-            reader = csv.reader(f,delimiter = ',')    
-            A=[]      
-            for row in reader:
-                dim=len(row)
-                A.append([0]*dim)
-                for j in range(0,dim):                
-                    A[-1][j]=float(row[j])
-            self.matrix=np.array(A)
-        f.close()
+        """
+        reads the csv file into a float array
+            if cache is set, the array is saved as sidecar file
+            <filename>.<size>-<mtime>.npy and memory mapped (copy on write) 
+            by later loads of the unchanged csv file, this saves the parsing
+            but no memory: init() copies the rows into the prepared matrix 
+            with the closing row of the bounding simplex
+        """
+        if not self.cache:
+            self.matrix=np.loadtxt(self.filename,delimiter=',',ndmin=2)
+            return
+        st=os.stat(self.filename)
+        sidecar='{0}.{1}-{2}.npy'.format(self.filename,st.st_size,st.st_mtime_ns)
+        if os.path.exists(sidecar):
+            self.matrix=np.load(sidecar,mmap_mode='c')
+            return
+        self.matrix=np.loadtxt(self.filename,delimiter=',',ndmin=2)
+        path,name=os.path.split(self.filename)
+        outdated=re.compile(re.escape(name)+r'\.\d+-\d+\.npy')
+        current=os.path.basename(sidecar) # may be written by another loader meanwhile
+        try:
+            for fn in os.listdir(path or '.'):
+                if outdated.fullmatch(fn) and fn!=current: # outdated sidecar
+                    os.remove(os.path.join(path,fn))
+            tmp='{0}.{1}.tmp'.format(sidecar,os.getpid())
+            with open(tmp,'wb') as f:
+                np.save(f,self.matrix)
+            os.replace(tmp,sidecar)
+        except OSError: # no sidecar, e.g. read-only directory
+            pass
         
-    def init(self):
-        self.__load_matrix()
+    def __init_stream(self):
+        """
+        prepares the first head rows of source as matrix, then matrix is
+        replaced by a RowStream consuming the remaining rows when needed
+            the bounding simplex contains the polytope of these rows, 
+            hence the polytope of all rows
+        """
+        source=iter(self.source)
+        self.matrix=read_rows(source,self.head)
+        if self.matrix is None:
+            print('Problem: source has no rows')
+            exit(1)
         self.__prepare_matrix()
+        n=self.matrix.shape[1]
+        self.matrix=RowStream(self.matrix[0:n+1],self.matrix[n+1:],source)
+        
+        
+    def init(self):
+        if self.source is None:
+            if self.matrix is None:
+                self.__load_matrix()
+            else: # rows given directly, e.g. Oracle.support_rows()
+                self.matrix=np.array(self.matrix,dtype=float)
+            self.__prepare_matrix()
+        else:
+            self.__init_stream()
         self.dim=len(self.matrix[0])
         if self.dim > 3 or self.dim < 2:
             print('dimension must be 2 or 3')
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Per-row instrumentation of GraphAlg and ApproxDDM
+
+    an engine with the attribute recorder set to a Recorder appends one
+    record (dict of numbers) for each row it processes, with recorder=None
+    (default) nothing is recorded, the cost is one test per row
+
+    columns of GraphAlg
+        row      : index of the row (oracle rows numbered after the matrix)
+        wall     : wall-clock time of the row in seconds
+        cpu      : CPU time of the row in seconds
+        signs    : CPU time of set_v_signs()  (local mode: hill climbing and
+        types    : CPU time of set_h_types()   exploration of the "+"-part
+        verts    : CPU time of add_verts()     are counted as signs)
+        cut      : CPU time of cut()
+        v_add    : vertices added, i.e. edges cut by the hyperplane
+        v_del    : vertices removed ("+"-vertices)
+        e_add    : edges added
+        e_del    : edges removed
+        f_add    : faces added
+        f_del    : faces removed
+        vertices : number of vertices after the row
+        edges    : number of edges after the row
+        faces    : number of faces after the row
+
+    columns of ApproxDDM
+        row, wall, cpu as above
+        signs    : CPU time of set_v_signs()
+        add      : CPU time of add_nodes()
+        delete   : CPU time of del_nodes()
+        n_add    : nodes added
+        n_del    : nodes removed ("+"-nodes)
+        nodes    : number of nodes after the row
+
+    memory mode (Recorder(memory=True)), further columns of both engines
+        bytes    : memory of the data structures after the row in bytes, 
+                   by the own size accounting of the engine, see nbytes()
+        traced   : memory allocated by Python after the row in bytes, only
+                   if tracemalloc is tracing, see Memory.py
+
+"""
+import numpy as np
+import json
+import tracemalloc
+from sys import exit
+
+
+class Recorder:
+    """
+    Collects the records of the rows processed by an engine column-wise
+        meta: dict of further information written to json, e.g. version,
+        instance or machine
+        memory: adds the columns of the memory mode
+    """
+    def __init__(self,meta=None,memory=False):
+        self.meta={} if meta is None else dict(meta)
+        self.memory=memory
+        self.columns={} # column name -> list of values, one per record
+        self.size=0
+
+
+    def __len__(self):
+        return self.size
+
+
+    def append(self,record,nbytes=None):
+        """
+        appends a record, all records need the same keys
+            nbytes: function returning the memory of the engine in bytes,
+            called in memory mode
+        """
+        if self.memory:
+            record['bytes']=nbytes()
+            if tracemalloc.is_tracing():
+                record['traced']=tracemalloc.get_traced_memory()[0]
+        if not self.columns:
+            self.columns={k:[] for k in record}
+        elif record.keys()!=self.columns.keys():
+            print('Recorder: record with keys {0} expected'.format(list(self.columns)))
+            exit(1)
+        for k,v in record.items():
+            self.columns[k].append(v)
+        self.size+=1
+
+
+    def clear(self):
+        self.columns={}
+        self.size=0
+
+
+    def arrays(self):
+        """
+        returns the columns as dict of arrays
+        """
+        return {k:np.array(v) for k,v in self.columns.items()}
+
+
+    def top(self,column,k=10):
+        """
+        returns the k records with the largest values in column, e.g.
+        top('v_add') for the rows causing blow-ups, as dict of arrays
+        """
+        a=self.arrays()
+        if column not in a:
+            print('Recorder: no column {}'.format(column))
+            exit(1)
+        i=np.argsort(a[column],kind='stable')[::-1][0:k]
+        return {c:v[i] for c,v in a.items()}
+
+
+    def peak(self,column='bytes'):
+        """
+        returns the maximum of column and the row where it occurred (first)
+        """
+        if self.size==0:
+            return 0,None
+        v=self.columns[column]
+        i=int(np.argmax(v))
+        return v[i],self.columns['row'][i]
+
+
+    def totals(self):
+        """
+        returns the sum of each column except row and the size columns
+        """
+        skip=('row','vertices','edges','faces','nodes','bytes','traced')
+        return {k:sum(v) for k,v in self.columns.items() if k not in skip}
+
+
+    def to_csv(self,filename):
+        keys=list(self.columns)
+        with open(filename,'w') as f:
+            f.write(','.join(keys)+'\n')
+            for r in zip(*self.columns.values()):
+                f.write(','.join(str(x) for x in r)+'\n')
+
+
+    def to_json(self,filename):
+        with open(filename,'w') as f:
+            json.dump({'meta':self.meta,'columns':self.columns},f)
+
+
+    @classmethod
+    def from_json(cls,filename):
+        """
+        reads a recorder written by to_json(), e.g. to compare versions
+        """
+        with open(filename) as f:
+            d=json.load(f)
+        r=cls(d['meta'])
+        r.columns=d['columns']
+        r.size=len(next(iter(r.columns.values()))) if r.columns else 0
+        return r
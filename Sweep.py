@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+Solving a problem for several tolerances eps in one call
+
+"""
+from time import process_time as clock
+from GraphAlg import GraphAlg
+from ApproxDDM import ApproxDDM
+
+
+def sweep(problem,eps_list,engines=('GraphAlg','ApproxDDM'),warm=False,local=False):
+    """
+    solves the initialized problem (matrix loaded and prepared once) for
+    each eps of eps_list, returns a list of dicts with the keys
+    eps, engine, time, total, vertices and faces
+        GraphAlg: with warm=True the tolerances are processed from coarse
+        to fine and each result is refined from the previous one, see
+        GraphAlg.refine(), time is the time of the refinement and total
+        the time since the coarsest run; a refinement pays off only if eps
+        decreases by at most a factor 2 (vertices of the previous result lie
+        at 1+eps/2), and it tends to keep more vertices than a new run
+        ApproxDDM: a new run for each eps, since the incidences depend on eps
+    problem.eps is restored at the end
+    """
+    eps0=problem.eps
+    results=[]
+    if 'GraphAlg' in engines:
+        a=None
+        total=0
+        for eps in (sorted(eps_list,reverse=True) if warm else eps_list):
+            t=clock()
+            if a is None or not warm:
+                problem.eps=eps
+                a=GraphAlg(problem)
+                a.local=local
+                a.run()
+                total=0
+            else:
+                a.refine(eps)
+            t=clock()-t
+            total+=t
+            results.append({'eps':eps,'engine':'GraphAlg','time':t,'total':total,
+                            'vertices':a.graph.number_of_vertices(),'faces':len(a.graph.faces)})
+    if 'ApproxDDM' in engines:
+        for eps in eps_list:
+            t=clock()
+            problem.eps=eps
+            b=ApproxDDM(problem)
+            b.run()
+            t=clock()-t
+            results.append({'eps':eps,'engine':'ApproxDDM','time':t,'total':t,
+                            'vertices':b.pool.size,'faces':len(b.facets)})
+    problem.eps=eps0
+    return results
+
+
+def write_csv(results,filename,keys=None):
+    """
+    writes result dicts, e.g. of sweep() or Batch.run_batch(), to a csv file, 
+    one column per key (default: keys of the first result), None is skipped
+    """
+    results=[r for r in results if r is not None]
+    if keys is None:
+        keys=list(results[0]) if results!=[] else []
+    with open(filename,'w') as f:
+        f.write(','.join(keys)+'\n')
+        for r in results:
+            f.write(','.join(str(r[k]) for k in keys)+'\n')
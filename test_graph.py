@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of Graph and ArrayGraph, run with pytest
+
+"""
+import numpy as np
+import pytest
+from Problem import Problem
+from GraphAlg import GraphAlg
+from Graph import Graph
+from ArrayGraph import ArrayGraph
+
+
+@pytest.mark.parametrize('graph_class',[Graph,ArrayGraph])
+def test_vector_kept_across_changes(graph_class):
+    # vertices are removed (rows reused) and coords are enlarged by the 
+    # added rows, a vector held before must not change
+    rng=np.random.default_rng(1)
+    rows=rng.normal(size=(60,3))
+    p=Problem(matrix=rows/np.linalg.norm(rows,axis=1)[:,np.newaxis],eps=1e-2)
+    p.init()
+    a=GraphAlg(p,graph_class)
+    a.run()
+    held=[(v.vector,v.vector.copy()) for v in a.graph.vertices]
+    more=rng.normal(size=(400,3))
+    a.add_inequalities(1.05*more/np.linalg.norm(more,axis=1)[:,np.newaxis])
+    assert all(np.array_equal(vec,old) for vec,old in held)
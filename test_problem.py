@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of Problem, run with pytest
+
+"""
+import numpy as np
+from Problem import Problem
+
+
+def test_basis_of_nearly_collinear_rows():
+    # the first rows are nearly collinear, the basis (rows 0,...,n-1 after
+    # init()) is taken from the cube rows
+    d=2e-3
+    near=[[1,0,0],[1,d,0],[1,d,d],[1,-d,d]]
+    cube=[[1,0,0],[-1,0,0],[0,1,0],[0,-1,0],[0,0,1],[0,0,-1]]
+    p=Problem(matrix=np.array(near+cube,dtype=float),eps=1e-3)
+    p.init()
+    B=p.matrix[0:3]/np.linalg.norm(p.matrix[0:3],axis=1)[:,np.newaxis]
+    assert np.linalg.cond(B)<2
+    V=np.array([[x,y,z] for x in (-1,1) for y in (-1,1) for z in (-1,1)],dtype=float)
+    assert (V @ p.matrix[0:4].T<=1+1e-9).all() # simplex contains the cube
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of GraphAlg.resolve(), run with pytest
+
+"""
+import numpy as np
+from Problem import Problem
+from GraphAlg import GraphAlg
+
+
+def box_rows():
+    """
+    box -1<=x2,x3<=1, x1<=1, bounded below only by a far row x1>=-10 and a
+    late tight row x1>=-1 (row 46), filled with redundant rows
+    """
+    rng=np.random.default_rng(0)
+    box=[[1,0,0],[0,1,0],[0,0,1],[0,-1,0],[0,0,-1]]
+    filler=(rng.random((40,3))-0.5)*0.2
+    return np.vstack((box,[[-0.1,0,0]],filler,[[-1,0,0]],filler*0.5))
+
+
+def solve(rows,eps=1e-3):
+    p=Problem(matrix=rows.copy(),eps=eps)
+    p.init()
+    a=GraphAlg(p)
+    a.snapshot_every=5
+    a.run()
+    return a
+
+
+def test_resolve_removed_row_of_closing_lp():
+    # the closing row of the bounding simplex depends on the tight row,
+    # the simplex of the rows without it must not cut off x1<-1
+    rows=box_rows()
+    a=solve(rows)
+    assert a.graph.get_coords()[:,0].min()>-1.01
+    new=np.delete(rows,46,axis=0)
+    a.resolve(new)
+    b=solve(new)
+    assert np.array_equal(a.matrix[0:4],b.matrix[0:4])
+    assert a.graph.size()==b.graph.size()
+    assert np.isclose(a.graph.get_coords()[:,0].min(),b.graph.get_coords()[:,0].min())
+    assert a.graph.get_coords()[:,0].min()<-10
+
+
+def test_resolve_removed_redundant_row():
+    # the simplex is unchanged, the fast path gives the result of a new run
+    rows=box_rows()
+    a=solve(rows)
+    new=np.delete(rows,80,axis=0)
+    a.resolve(new)
+    b=solve(new)
+    assert a.graph.size()==b.graph.size()
+    assert np.allclose(np.sort(a.graph.get_coords(),axis=0),np.sort(b.graph.get_coords(),axis=0))